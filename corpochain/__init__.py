@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-from pkg_resources import DistributionNotFound, get_distribution, resource_filename
+import os
+import sys
+
+if sys.version_info >= (3, 8):
+    from importlib.metadata import PackageNotFoundError, version
+else:
+    from pkg_resources import DistributionNotFound as PackageNotFoundError
+    from pkg_resources import get_distribution
+
+    def version(distribution_name: str) -> str:
+        return str(get_distribution(distribution_name).version)
+
 
 try:
-    __version__ = get_distribution("corpochain-beacon-client").version
-except DistributionNotFound:
+    __version__ = version("corpochain-beacon-client")
+except PackageNotFoundError:
     # package is not installed
     __version__ = "unknown"
 
-PYINSTALLER_SPEC_PATH = resource_filename("corpochain", "pyinstaller.spec")
+PYINSTALLER_SPEC_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pyinstaller.spec")
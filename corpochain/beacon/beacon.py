@@ -42,6 +42,7 @@ from corpochain.server.peer_store_resolver import PeerStoreResolver
 from corpochain.server.server import CorpochainServer
 from corpochain.server.ws_connection import WSCorpochainConnection
 from corpochain.types.blockchain_format.classgroup import ClassgroupElement
+from corpochain.types.blockchain_format.execution_payload import ExecutionPayloadV2, PayloadStatus
 from corpochain.types.blockchain_format.sized_bytes import bytes32
 from corpochain.types.blockchain_format.sub_epoch_summary import SubEpochSummary
 from corpochain.types.blockchain_format.vdf import CompressibleVDFField, VDFInfo, VDFProof
@@ -60,7 +61,7 @@ from corpochain.util.limited_semaphore import LimitedSemaphore
 from corpochain.util.path import path_from_root
 from corpochain.util.profiler import mem_profile_task, profile_task
 from corpochain.util.safe_cancel_task import cancel_task_safe
-from corpochain.beacon.execution_client import ExecutionClient
+from corpochain.beacon.execution_client import NEW_PAYLOAD_BATCH_SIZE, ExecutionClient
 
 
 # This is the result of calling peak_post_processing, which is then fed into peak_post_processing_2
@@ -278,6 +279,7 @@ class Beacon:
         start_time = time.time()
         reserved_cores = self.config.get("reserved_cores", 0)
         single_threaded = self.config.get("single_threaded", False)
+        validation_threads = self.config.get("validation_threads", False)
         multiprocessing_start_method = process_config_start_method(config=self.config, log=self.log)
         self.multiprocessing_context = multiprocessing.get_context(method=multiprocessing_start_method)
         self._blockchain = await Blockchain.create(
@@ -288,6 +290,7 @@ class Beacon:
             reserved_cores=reserved_cores,
             multiprocessing_context=self.multiprocessing_context,
             single_threaded=single_threaded,
+            validation_threads=validation_threads,
         )
 
         blockchain_lock_queue = LockQueue(self.blockchain.lock)
@@ -336,17 +339,17 @@ class Beacon:
                     assert full_tx_peak.execution_payload is not None
                     
                     status = await self.execution_client.new_payload(full_tx_peak.execution_payload)
-                    if status == "INVALID" or status == "INVALID_BLOCK_HASH":
-                        raise RuntimeError(f"Payload status: {status}. Database is corrupted.")
-                    elif status != "VALID" and status != "SYNCING" and status != "ACCEPTED":
+                    if status in (PayloadStatus.INVALID, PayloadStatus.INVALID_BLOCK_HASH):
+                        raise RuntimeError(f"Payload status: {status.name}. Database is corrupted.")
+                    elif status not in (PayloadStatus.VALID, PayloadStatus.SYNCING, PayloadStatus.ACCEPTED):
                         raise RuntimeError("Unexpected payload status.")
                     
                 status = await self.execution_client.forkchoice_update(tx_peak)
-                if status == "INVALID" or status == "INVALID_BLOCK_HASH":
-                    raise RuntimeError(f"Fork choice status: {status}. Database is corrupted.")
-                elif status == "VALID":
+                if status in (PayloadStatus.INVALID, PayloadStatus.INVALID_BLOCK_HASH):
+                    raise RuntimeError(f"Fork choice status: {status.name}. Database is corrupted.")
+                elif status is PayloadStatus.VALID:
                     self.log.info("Execution chain head has been updated.")
-                elif status == "SYNCING" or status == "ACCEPTED":
+                elif status in (PayloadStatus.SYNCING, PayloadStatus.ACCEPTED):
                     self.log.info("Execution chain synchronization has been started.")
                 else:
                     raise RuntimeError("Unexpected fork choice status.")
@@ -1055,14 +1058,23 @@ class Beacon:
                 )
                 return False, None
 
+        payload_statuses: Dict[bytes32, Optional[PayloadStatus]] = {}
         agg_state_change_summary: Optional[StateChangeSummary] = None
 
         for i, block in enumerate(blocks_to_validate):
+            if i % NEW_PAYLOAD_BATCH_SIZE == 0:
+                # Sends the payloads of the next chunk of blocks. If receive_block rejects a block, up to
+                # NEW_PAYLOAD_BATCH_SIZE - 1 payloads after it in the same chunk were already sent to the EL,
+                # but no later chunk is
+                payload_statuses = await self._new_payload_batch(blocks_to_validate[i : i + NEW_PAYLOAD_BATCH_SIZE])
             assert pre_validation_results[i].required_iters is not None
             state_change_summary: Optional[StateChangeSummary]
             advanced_peak = agg_state_change_summary is not None
             result, error, state_change_summary = await self.blockchain.receive_block(
-                block, pre_validation_results[i], None if advanced_peak else fork_point
+                block,
+                pre_validation_results[i],
+                None if advanced_peak else fork_point,
+                payload_statuses.get(block.header_hash),
             )
 
             if result == ReceiveBlockResult.NEW_PEAK:
@@ -1093,6 +1105,26 @@ class Beacon:
             )
         return True, agg_state_change_summary
 
+    async def _new_payload_batch(self, blocks: List[FullBlock]) -> Dict[bytes32, Optional[PayloadStatus]]:
+        """
+        Sends the execution payloads of the blocks to the execution client at once, instead of one per block.
+        Blocks missing from the result get their payload sent on its own by receive_block.
+        """
+        header_hashes: List[bytes32] = []
+        payloads: List[ExecutionPayloadV2] = []
+        for block in blocks:
+            if block.execution_payload is not None:
+                header_hashes.append(block.header_hash)
+                payloads.append(block.execution_payload)
+        if len(payloads) <= 1:
+            return {}
+        try:
+            statuses = await self.execution_client.new_payload_batch(payloads)
+        except Exception as e:
+            self.log.warning(f"Batched execution payload import failed, falling back to single payloads: {e}")
+            return {}
+        return dict(zip(header_hashes, statuses))
+
     async def _finish_sync(self) -> None:
         """
         Finalize sync by setting sync mode to False, clearing all sync information, and adding any final
@@ -1421,7 +1453,7 @@ class Beacon:
         state_changed_data: Dict[str, Any] = {
             "transaction_block": False,
             "k_size": block.reward_chain_block.proof_of_space.size,
-            "header_hash": block.header_hash,
+            "header_hash": header_hash,
             "height": block.height,
             "validation_time": validation_time,
             "pre_validation_time": pre_validation_time,
@@ -1435,7 +1467,7 @@ class Beacon:
 
         self._state_changed("block", state_changed_data)
 
-        record = self.blockchain.block_record(block.header_hash)
+        record = self.blockchain.block_record(header_hash)
         if self.weight_proof_handler is not None and record.sub_epoch_summary_included is not None:
             if self._segment_task is None or self._segment_task.done():
                 self._segment_task = asyncio.create_task(self.weight_proof_handler.create_prev_sub_epoch_segments())
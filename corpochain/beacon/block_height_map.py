@@ -142,8 +142,11 @@ class BlockHeightMap:
         if ses is not None:
             self.__sub_epoch_summaries[height] = bytes(ses)
 
+    def needs_flush(self) -> bool:
+        return self.__counter >= 1000
+
     async def maybe_flush(self) -> None:
-        if self.__counter < 1000:
+        if not self.needs_flush():
             return
 
         assert (len(self.__height_to_hash) % 32) == 0
@@ -237,6 +240,12 @@ class BlockHeightMap:
         assert idx + 32 <= len(self.__height_to_hash)
         return bytes32(self.__height_to_hash[idx : idx + 32])
 
+    def try_get_hash(self, height: uint32) -> Optional[bytes32]:
+        idx = height * 32
+        if idx + 32 > len(self.__height_to_hash):
+            return None
+        return bytes32(self.__height_to_hash[idx : idx + 32])
+
     def contains_height(self, height: uint32) -> bool:
         return height * 32 < len(self.__height_to_hash)
 
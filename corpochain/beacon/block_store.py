@@ -12,6 +12,7 @@ from corpochain.consensus.block_record import BlockRecord
 from corpochain.types.blockchain_format.sized_bytes import bytes32
 from corpochain.types.full_block import FullBlock
 from corpochain.types.weight_proof import SubEpochChallengeSegment, SubEpochSegments
+from corpochain.util.chunks import chunks
 from corpochain.util.db_wrapper import DbWrapper
 from corpochain.util.errors import Err
 from corpochain.util.ints import uint32
@@ -299,6 +300,31 @@ class BlockStore:
 
         return None
 
+    async def prev_block_hash(self, header_hashes: List[bytes32], batch_size: int = 900) -> List[bytes32]:
+        """
+        Returns the prev_hash of each block, ordered by the same order in which header_hashes are passed in.
+        Only the prev_hash column is read, no block record is parsed.
+        Throws an exception if the blocks are not present
+        """
+        assert batch_size < 999  # sqlite in python 3.7 has a limit on 999 variables in queries
+        prev_hashes: Dict[bytes32, bytes32] = {}
+        async with self.db_wrapper.reader_no_transaction() as conn:
+            for batch in chunks(header_hashes, batch_size):
+                async with conn.execute(
+                    "SELECT header_hash,prev_hash FROM full_blocks "
+                    f'WHERE header_hash in ({"?," * (len(batch) - 1)}?)',
+                    batch,
+                ) as cursor:
+                    for row in await cursor.fetchall():
+                        prev_hashes[bytes32(row[0])] = bytes32(row[1])
+
+        ret: List[bytes32] = []
+        for hh in header_hashes:
+            if hh not in prev_hashes:
+                raise ValueError(f"Header hash {hh} not in the blockchain")
+            ret.append(prev_hashes[hh])
+        return ret
+
     async def get_block_records_in_range(
         self,
         start: int,
@@ -2,10 +2,15 @@ from __future__ import annotations
 
 import logging
 import asyncio
+import json
 import time
 
 from typing import (
+    Any,
+    Dict,
+    List,
     Optional,
+    Tuple,
     Union,
 )
 
@@ -14,17 +19,23 @@ from web3.method import Method
 from web3.module import Module
 from web3.providers.rpc import URI
 import jwt
+import requests
 from hexbytes import HexBytes
 
 from corpochain.util.path import path_from_root
 from corpochain.consensus.block_record import BlockRecord
 from corpochain.types.blockchain_format.sized_bytes import bytes20, bytes32, bytes256
 from corpochain.util.ints import uint64, uint256
-from corpochain.types.blockchain_format.execution_payload import ExecutionPayloadV2, WithdrawalV1
+from corpochain.types.blockchain_format.execution_payload import ExecutionPayloadV2, PayloadStatus, WithdrawalV1
 from corpochain.util.byte_types import hexstr_to_bytes
 from corpochain.consensus.block_rewards import create_withdrawals
 from corpochain.util.lru_cache import LRUCache
 
+# Maximum number of payloads sent to the execution client in a single JSON-RPC batch
+NEW_PAYLOAD_BATCH_SIZE = 16
+# Timeout in seconds of a batch request, unless the provider has its own (web3 uses 10 for single requests)
+BATCH_REQUEST_TIMEOUT = 10
+
 COINBASE_NULL = bytes20.fromhex("0000000000000000000000000000000000000000")
 BLOCK_HASH_NULL = bytes32.fromhex("0000000000000000000000000000000000000000000000000000000000000000")
 
@@ -32,6 +43,7 @@ log = logging.getLogger(__name__)
 
 class HTTPAuthProvider(HTTPProvider):
     secret: bytes
+    session: requests.Session
 
     def __init__(
         self,
@@ -39,7 +51,8 @@ class HTTPAuthProvider(HTTPProvider):
         endpoint_uri: Optional[Union[URI, str]] = None,
     ) -> None:
         self.secret = secret
-        super().__init__(endpoint_uri)
+        self.session = requests.Session()
+        super().__init__(endpoint_uri, session=self.session)
     
     def get_request_headers(self) -> Dict[str, str]:
         headers = super().get_request_headers()
@@ -58,6 +71,23 @@ class HTTPAuthProvider(HTTPProvider):
             }
         )
         return headers
+    
+    def make_batch_request(self, calls: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        assert self.endpoint_uri is not None
+        request_data = json.dumps(
+            [
+                {"jsonrpc": "2.0", "method": method, "params": params, "id": request_id}
+                for request_id, (method, params) in enumerate(calls)
+            ]
+        ).encode()
+        request_kwargs = self.get_request_kwargs()
+        request_kwargs.setdefault("timeout", BATCH_REQUEST_TIMEOUT)
+        response = self.session.post(self.endpoint_uri, data=request_data, **request_kwargs)
+        response.raise_for_status()
+        responses = response.json()
+        if not isinstance(responses, list):
+            raise ValueError(f"Unexpected batch response: {responses}")
+        return responses
 
 class EngineModule(Module):
     exchange_transition_configuration_v1 = Method("engine_exchangeTransitionConfigurationV1")
@@ -68,6 +98,7 @@ class EngineModule(Module):
 class ExecutionClient:
     beacon: Beacon
     w3: Web3
+    provider: Optional[HTTPAuthProvider]
     payload_cache: LRUCache[bytes32, str]
     syncing: bool
 
@@ -77,6 +108,7 @@ class ExecutionClient:
     ):
         self.beacon = beacon
         self.w3 = None
+        self.provider = None
         self.payload_cache = LRUCache(16)
         self.syncing = False
         self.connected = False
@@ -108,39 +140,10 @@ class ExecutionClient:
     async def new_payload(
         self,
         payload: ExecutionPayloadV2,
-    ) -> str:
+    ) -> PayloadStatus:
         self._ensure_web3_init()
         
-        raw_transactions = []
-        for transaction in payload.transactions:
-            raw_transactions.append("0x" + transaction.hex())
-        
-        raw_withdrawals = []
-        for withdrawal in payload.withdrawals:
-            raw_withdrawals.append({
-                "index": Web3.to_hex(withdrawal.index),
-                "validatorIndex": Web3.to_hex(withdrawal.validatorIndex),
-                "address": "0x" + withdrawal.address.hex(),
-                "amount": Web3.to_hex(withdrawal.amount),
-            })
-        
-        raw_payload = {
-            "parentHash": "0x" + payload.parentHash.hex(),
-            "feeRecipient": "0x" + payload.feeRecipient.hex(),
-            "stateRoot": "0x" + payload.stateRoot.hex(),
-            "receiptsRoot": "0x" + payload.receiptsRoot.hex(),
-            "logsBloom": "0x" + payload.logsBloom.hex(),
-            "prevRandao": "0x" + payload.prevRandao.hex(),
-            "blockNumber": Web3.to_hex(payload.blockNumber),
-            "gasLimit": Web3.to_hex(payload.gasLimit),
-            "gasUsed": Web3.to_hex(payload.gasUsed),
-            "timestamp": Web3.to_hex(payload.timestamp),
-            "extraData": "0x" + payload.extraData.hex(),
-            "baseFeePerGas": Web3.to_hex(payload.baseFeePerGas),
-            "blockHash": "0x" + payload.blockHash.hex(),
-            "transactions": raw_transactions,
-            "withdrawals": raw_withdrawals,
-        }
+        raw_payload = self._create_raw_payload(payload)
 
         try:
             result = self.w3.engine.new_payload_v2(raw_payload)
@@ -148,24 +151,56 @@ class ExecutionClient:
             self.connected = False
             raise
         self.connected = True
-        if result.validationError is not None:
-            log.error(
-                f"Payload validation error: Eheight={payload.blockNumber}, Ehash={payload.blockHash}, "
-                f"status={result.status}, error={result.validationError}"
-            )
-        else:
-            log.info(
-                f"Processed execution payload: Eheight={payload.blockNumber}, Ehash={payload.blockHash}, "
-                f"status={result.status}"
-            )
         
-        return result.status
+        return self._process_payload_status(payload, result.status, result.validationError)
+    
+    
+    async def new_payload_batch(
+        self,
+        payloads: List[ExecutionPayloadV2],
+    ) -> List[Optional[PayloadStatus]]:
+        """
+        Sends the payloads to the execution client in a single JSON-RPC batch, in chain order. Returns the status of
+        each payload, or None for payloads that have to be sent again one by one.
+        JSON-RPC does not require the elements of a batch to be processed in order, and a payload processed before
+        its parent gets SYNCING or ACCEPTED. So only VALID and INVALID statuses are final, any other status is
+        returned as None and the payload is sent again after its parent.
+        """
+        self._ensure_web3_init()
+        assert self.provider is not None
+        
+        calls = [("engine_newPayloadV2", [self._create_raw_payload(payload)]) for payload in payloads]
+        try:
+            responses = self.provider.make_batch_request(calls)
+        except:
+            self.connected = False
+            raise
+        self.connected = True
+        
+        statuses: List[Optional[PayloadStatus]] = [None] * len(payloads)
+        for response in responses:
+            request_id = response.get("id")
+            result = response.get("result")
+            if not isinstance(request_id, int) or not 0 <= request_id < len(payloads):
+                continue
+            payload = payloads[request_id]
+            if result is None:
+                log.warning(
+                    f"Batched payload not processed: Eheight={payload.blockNumber}, Ehash={payload.blockHash}, "
+                    f"error={response.get('error')}"
+                )
+                continue
+            status = self._process_payload_status(payload, result["status"], result.get("validationError"))
+            if status in (PayloadStatus.VALID, PayloadStatus.INVALID, PayloadStatus.INVALID_BLOCK_HASH):
+                statuses[request_id] = status
+        
+        return statuses
     
     
     async def forkchoice_update(
         self,
         block: BlockRecord,
-    ) -> None:
+    ) -> PayloadStatus:
         log.info("Fork choice update")
         
         self._ensure_web3_init()
@@ -239,14 +274,15 @@ class ExecutionClient:
         elif synced:
             log.warning("Payload building not started")
         
-        if result.payloadStatus.status == "VALID" and self.syncing:
+        status = PayloadStatus.from_str(result.payloadStatus.status)
+        if status is PayloadStatus.VALID and self.syncing:
             self.syncing = False
             log.info(f"Execution Client is now fully synced")
-        elif result.payloadStatus.status != "VALID" and not self.syncing:
+        elif status is not PayloadStatus.VALID and not self.syncing:
             self.syncing = True
             log.info(f"Execution Client syncing started")
         
-        return result.payloadStatus.status
+        return status
     
     
     def get_payload(
@@ -338,18 +374,73 @@ class ExecutionClient:
             log.error(f"Exception in Web3 init: {e}")
             raise RuntimeError("Cannot open JWT secret file. Execution client is not running or needs more time to start.")
         
-        self.w3 = Web3(
-            HTTPAuthProvider(
-                hexstr_to_bytes(secret),
-                execution_endpoint,
-            )
+        self.provider = HTTPAuthProvider(
+            hexstr_to_bytes(secret),
+            execution_endpoint,
         )
+        self.w3 = Web3(self.provider)
 
         self.w3.attach_modules({
             "engine": EngineModule
         })
     
     
+    def _create_raw_payload(
+        self,
+        payload: ExecutionPayloadV2,
+    ) -> Dict[str, Any]:
+        raw_transactions = []
+        for transaction in payload.transactions:
+            raw_transactions.append("0x" + transaction.hex())
+        
+        raw_withdrawals = []
+        for withdrawal in payload.withdrawals:
+            raw_withdrawals.append({
+                "index": Web3.to_hex(withdrawal.index),
+                "validatorIndex": Web3.to_hex(withdrawal.validatorIndex),
+                "address": "0x" + withdrawal.address.hex(),
+                "amount": Web3.to_hex(withdrawal.amount),
+            })
+        
+        return {
+            "parentHash": "0x" + payload.parentHash.hex(),
+            "feeRecipient": "0x" + payload.feeRecipient.hex(),
+            "stateRoot": "0x" + payload.stateRoot.hex(),
+            "receiptsRoot": "0x" + payload.receiptsRoot.hex(),
+            "logsBloom": "0x" + payload.logsBloom.hex(),
+            "prevRandao": "0x" + payload.prevRandao.hex(),
+            "blockNumber": Web3.to_hex(payload.blockNumber),
+            "gasLimit": Web3.to_hex(payload.gasLimit),
+            "gasUsed": Web3.to_hex(payload.gasUsed),
+            "timestamp": Web3.to_hex(payload.timestamp),
+            "extraData": "0x" + payload.extraData.hex(),
+            "baseFeePerGas": Web3.to_hex(payload.baseFeePerGas),
+            "blockHash": "0x" + payload.blockHash.hex(),
+            "transactions": raw_transactions,
+            "withdrawals": raw_withdrawals,
+        }
+    
+    
+    def _process_payload_status(
+        self,
+        payload: ExecutionPayloadV2,
+        status: str,
+        validation_error: Optional[str],
+    ) -> PayloadStatus:
+        if validation_error is not None:
+            log.error(
+                f"Payload validation error: Eheight={payload.blockNumber}, Ehash={payload.blockHash}, "
+                f"status={status}, error={validation_error}"
+            )
+        else:
+            log.info(
+                f"Processed execution payload: Eheight={payload.blockNumber}, Ehash={payload.blockHash}, "
+                f"status={status}"
+            )
+        
+        return PayloadStatus.from_str(status)
+    
+    
     def _create_payload_attributes(
         self,
         prev_tx_block: BlockRecord,
@@ -10,6 +10,9 @@ from corpochain.util.streamable import Streamable, streamable
 @streamable
 @dataclass(frozen=True)
 class SignagePoint(Streamable):
+    # Signage points are created in large numbers, so avoid a per-instance __dict__
+    __slots__ = ("cc_vdf", "cc_proof", "rc_vdf", "rc_proof")
+
     cc_vdf: Optional[VDFInfo]
     cc_proof: Optional[VDFProof]
     rc_vdf: Optional[VDFInfo]
@@ -1,35 +1,57 @@
 from __future__ import annotations
 
+import importlib
 from io import TextIOWrapper
-from typing import Optional
+from typing import List, Optional
 
 import click
 
 from corpochain import __version__
-from corpochain.cmds.beta import beta_cmd
-from corpochain.cmds.configure import configure_cmd
-from corpochain.cmds.db import db_cmd
-from corpochain.cmds.farm import farm_cmd
-from corpochain.cmds.init import init_cmd
-from corpochain.cmds.keys import keys_cmd
-from corpochain.cmds.netspace import netspace_cmd
-from corpochain.cmds.passphrase import passphrase_cmd
-from corpochain.cmds.peer import peer_cmd
-from corpochain.cmds.plots import plots_cmd
-from corpochain.cmds.plotters import plotters_cmd
-from corpochain.cmds.rpc import rpc_cmd
-from corpochain.cmds.show import show_cmd
-from corpochain.cmds.start import start_cmd
-from corpochain.cmds.stop import stop_cmd
 from corpochain.util.default_root import DEFAULT_KEYS_ROOT_PATH, DEFAULT_ROOT_PATH
 from corpochain.util.errors import KeychainCurrentPassphraseIsInvalid
 from corpochain.util.keychain import Keychain, set_keys_root_path
-from corpochain.util.ssl_check import check_ssl
 
 CONTEXT_SETTINGS = dict(help_option_names=["-h", "--help"])
 
+# Subcommands living in corpochain.cmds.<name> as <name>_cmd, imported only when used
+LAZY_SUBCOMMANDS = (
+    "keys",
+    "plots",
+    "configure",
+    "init",
+    "rpc",
+    "show",
+    "start",
+    "stop",
+    "netspace",
+    "farm",
+    "plotters",
+    "db",
+    "peer",
+    "passphrase",
+    "beta",
+)
+
+
+class LazyGroup(click.Group):
+    """
+    Click group which defers importing a subcommand module until that subcommand is invoked,
+    so that fast commands like 'version' don't pay for the imports of every other command.
+    """
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted([*super().list_commands(ctx), *LAZY_SUBCOMMANDS])
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in LAZY_SUBCOMMANDS:
+            module = importlib.import_module(f"corpochain.cmds.{cmd_name}")
+            command: click.Command = getattr(module, f"{cmd_name}_cmd")
+            return command
+        return super().get_command(ctx, cmd_name)
+
 
 @click.group(
+    cls=LazyGroup,
     help=f"\n  Manage corpochain beacon chain infrastructure ({__version__})\n",
     epilog="Try 'corpochain start beacon', 'corpochain netspace -d 192', or 'corpochain show -s'",
     context_settings=CONTEXT_SETTINGS,
@@ -76,8 +98,6 @@ def cli(
         except Exception as e:
             print(f"Failed to read passphrase: {e}")
 
-    check_ssl(Path(root_path))
-
 
 @cli.command("version", short_help="Show corpochain version")
 def version_cmd() -> None:
@@ -94,31 +114,14 @@ def version_cmd() -> None:
 )
 @click.pass_context
 def run_daemon_cmd(ctx: click.Context, wait_for_unlock: bool) -> None:
-    import asyncio
-
-    from corpochain.daemon.server import async_run_daemon
+    from corpochain.daemon.server import run_daemon
     from corpochain.util.keychain import Keychain
+    from corpochain.util.ssl_check import check_ssl
 
+    check_ssl(ctx.obj["root_path"])
     wait_for_unlock = wait_for_unlock and Keychain.is_keyring_locked()
 
-    asyncio.run(async_run_daemon(ctx.obj["root_path"], wait_for_unlock=wait_for_unlock))
-
-
-cli.add_command(keys_cmd)
-cli.add_command(plots_cmd)
-cli.add_command(configure_cmd)
-cli.add_command(init_cmd)
-cli.add_command(rpc_cmd)
-cli.add_command(show_cmd)
-cli.add_command(start_cmd)
-cli.add_command(stop_cmd)
-cli.add_command(netspace_cmd)
-cli.add_command(farm_cmd)
-cli.add_command(plotters_cmd)
-cli.add_command(db_cmd)
-cli.add_command(peer_cmd)
-cli.add_command(passphrase_cmd)
-cli.add_command(beta_cmd)
+    run_daemon(ctx.obj["root_path"], wait_for_unlock=wait_for_unlock)
 
 
 def main() -> None:
@@ -53,8 +53,11 @@ def get_routes(service: str, config: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @click.group("rpc", short_help="RPC Client")
-def rpc_cmd() -> None:
-    pass
+@click.pass_context
+def rpc_cmd(ctx: click.Context) -> None:
+    from corpochain.util.ssl_check import check_ssl
+
+    check_ssl(ctx.obj["root_path"])
 
 
 @rpc_cmd.command("endpoints", help="Print all endpoints of a service")
@@ -3,12 +3,12 @@ from __future__ import annotations
 import click
 
 from corpochain.util.config import load_config
-from corpochain.util.service_groups import all_groups
+from corpochain.util.service_groups import ALL_GROUPS
 
 
 @click.command("start", short_help="Start service groups")
 @click.option("-r", "--restart", is_flag=True, type=bool, help="Restart running services")
-@click.argument("group", type=click.Choice(list(all_groups())), nargs=-1, required=True)
+@click.argument("group", type=click.Choice(ALL_GROUPS), nargs=-1, required=True)
 @click.pass_context
 def start_cmd(ctx: click.Context, restart: bool, group: str) -> None:
     import asyncio
@@ -17,7 +17,10 @@ def start_cmd(ctx: click.Context, restart: bool, group: str) -> None:
 
     from .start_funcs import async_start
 
+    from corpochain.util.ssl_check import check_ssl
+
     root_path = ctx.obj["root_path"]
+    check_ssl(root_path)
     config = load_config(root_path, "config.yaml")
     warn_if_beta_enabled(config)
     asyncio.run(async_start(root_path, config, group, restart))
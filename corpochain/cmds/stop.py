@@ -8,7 +8,7 @@ from typing import Any, Dict
 import click
 
 from corpochain.util.config import load_config
-from corpochain.util.service_groups import all_groups, services_for_groups
+from corpochain.util.service_groups import ALL_GROUPS, services_for_groups
 
 
 async def async_stop(root_path: Path, config: Dict[str, Any], group: str, stop_daemon: bool) -> int:
@@ -49,7 +49,7 @@ async def async_stop(root_path: Path, config: Dict[str, Any], group: str, stop_d
 
 @click.command("stop", short_help="Stop services")
 @click.option("-d", "--daemon", is_flag=True, type=bool, help="Stop daemon")
-@click.argument("group", type=click.Choice(list(all_groups())), nargs=-1, required=True)
+@click.argument("group", type=click.Choice(ALL_GROUPS), nargs=-1, required=True)
 @click.pass_context
 def stop_cmd(ctx: click.Context, daemon: bool, group: str) -> None:
     from corpochain.cmds.beta_funcs import warn_if_beta_enabled
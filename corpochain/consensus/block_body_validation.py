@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import collections
 import logging
-from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from corpochain.consensus.block_record import BlockRecord
 from corpochain.consensus.blockchain_interface import BlockchainInterface
 from corpochain.consensus.constants import ConsensusConstants
 from corpochain.consensus.find_fork_point import find_fork_point_in_chain
 from corpochain.beacon.block_store import BlockStore
+from corpochain.types.blockchain_format.execution_payload import PayloadStatus
 from corpochain.types.blockchain_format.sized_bytes import bytes32
 from corpochain.types.full_block import FullBlock
 from corpochain.types.unfinished_block import UnfinishedBlock
@@ -16,45 +17,70 @@ from corpochain.util.errors import Err
 from corpochain.util.hash import std_hash
 from corpochain.util.ints import uint32, uint64
 
+if TYPE_CHECKING:
+    from corpochain.beacon.execution_client import ExecutionClient
+
 log = logging.getLogger(__name__)
 
+_INVALID_PAYLOAD_STATUSES = frozenset((PayloadStatus.INVALID, PayloadStatus.INVALID_BLOCK_HASH))
+_PENDING_PAYLOAD_STATUSES = frozenset((PayloadStatus.SYNCING, PayloadStatus.ACCEPTED))
+
+
+def needs_payload_validation(
+    block: Union[FullBlock, UnfinishedBlock],
+    height: uint32,
+) -> bool:
+    """
+    Synchronous part of the block body validation. Returns True if the block has an execution payload, which
+    validate_block_body has to check. The body of a block without a payload is valid.
+    """
+    # Callers pass the block's own height for full blocks. Only checked in debug runs, `python -O` drops the branch.
+    if __debug__ and type(block) is FullBlock:
+        assert height == block.height
+
+    return block.execution_payload is not None
+
 
 async def validate_block_body(
     execution_client: ExecutionClient,
     block: Union[FullBlock, UnfinishedBlock],
     height: uint32,
     block_record: Optional[BlockRecord],
+    payload_status: Optional[PayloadStatus] = None,
 ) -> Optional[Err]:
     """
-    This assumes the header block has been completely validated.
+    This assumes the header block has been completely validated, and that needs_payload_validation returned True.
     Validates the body of the block. Returns None if everything validates correctly, or an Err if something does not validate.
+    payload_status can be passed if the payload was already sent to the execution client, e.g. in a batch.
     """
-    if isinstance(block, FullBlock):
-        assert height == block.height            
-    
-    if block.execution_payload is None:
-        return None
-    
-    status = await execution_client.new_payload(block.execution_payload)
-    if status == "INVALID" or status == "INVALID_BLOCK_HASH":
+    assert block.execution_payload is not None
+
+    is_full_block = type(block) is FullBlock
+    assert is_full_block or type(block) is UnfinishedBlock
+
+    if payload_status is not None:
+        status = payload_status
+    else:
+        status = await execution_client.new_payload(block.execution_payload)
+    if status in _INVALID_PAYLOAD_STATUSES:
         return Err.PAYLOAD_INVALIDATED
-    elif status == "SYNCING" or status == "ACCEPTED":
-        if isinstance(block, UnfinishedBlock):
+    elif status in _PENDING_PAYLOAD_STATUSES:
+        if not is_full_block:
             return Err.PAYLOAD_NOT_VALIDATED
-    elif status != "VALID":
+    elif status is not PayloadStatus.VALID:
         return Err.UNKNOWN
-    
-    if isinstance(block, FullBlock):
+
+    if is_full_block:
         assert block_record is not None
         optimistic_import = execution_client.beacon.config.get("optimistic_import", True)
-        
+
         status = await execution_client.forkchoice_update(block_record)
-        if status == "INVALID" or status == "INVALID_BLOCK_HASH":
+        if status in _INVALID_PAYLOAD_STATUSES:
             return Err.PAYLOAD_INVALIDATED
-        elif status == "SYNCING" or status == "ACCEPTED":
+        elif status in _PENDING_PAYLOAD_STATUSES:
             if not optimistic_import:
                 return Err.PAYLOAD_NOT_VALIDATED
-        elif status != "VALID":
+        elif status is not PayloadStatus.VALID:
             return Err.UNKNOWN
-    
+
     return None
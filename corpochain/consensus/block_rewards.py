@@ -1,15 +1,38 @@
 from __future__ import annotations
 
-from typing import List
+from bisect import bisect_right
+from typing import Iterator, List, Tuple
 
-from corpochain.util.ints import uint64
+from corpochain.util.ints import uint32, uint64
 from corpochain.types.blockchain_format.execution_payload import WithdrawalV1
 from corpochain.consensus.block_record import BlockRecord
 from corpochain.consensus.blockchain_interface import BlockchainInterface
 from corpochain.consensus.constants import ConsensusConstants
 
-_corpochain_to_gwei = 1000000000
-_blocks_per_year = 4608 * 2 * 365
+_corpochain_to_gwei: int = 1000000000
+_blocks_per_year: int = 4608 * 2 * 365
+
+_PREFARM_VALIDATOR_INDEX: uint64 = uint64(0)
+_BLOCK_REWARD_VALIDATOR_INDEX: uint64 = uint64(1)
+
+# Reward halves every 3 years. _REWARDS[i] is the reward in gwei for heights below _REWARD_BOUNDARIES[i],
+# the trailing 0 applies to all heights past the last boundary.
+_REWARD_BOUNDARIES: Tuple[int, ...] = (
+    3 * _blocks_per_year,
+    6 * _blocks_per_year,
+    9 * _blocks_per_year,
+    12 * _blocks_per_year,
+    15 * _blocks_per_year,
+)
+_REWARDS: Tuple[uint64, ...] = (
+    uint64(2 * _corpochain_to_gwei),
+    uint64(_corpochain_to_gwei),
+    uint64(_corpochain_to_gwei // 2),
+    uint64(_corpochain_to_gwei // 4),
+    uint64(_corpochain_to_gwei // 8),
+    uint64(0),
+)
+
 
 def create_withdrawals(
     constants: ConsensusConstants,
@@ -18,7 +41,8 @@ def create_withdrawals(
 ) -> List[WithdrawalV1]:
     withdrawals: List[WithdrawalV1] = []
     
-    next_wd_index: uint64
+    # Plain int while counting, wrapped in uint64 only when a withdrawal is built
+    next_wd_index: int
     if prev_tx_block.last_withdrawal_index is None:
         next_wd_index = 0
     else:
@@ -28,47 +52,52 @@ def create_withdrawals(
         # Add prefarm withdrawal
         withdrawals.append(
             WithdrawalV1(
-                next_wd_index,
-                uint64(0),
+                uint64(next_wd_index),
+                _PREFARM_VALIDATOR_INDEX,
                 constants.PREFARM_ADDRESS,
-                constants.PREFARM_AMOUNT * _corpochain_to_gwei,
+                uint64(constants.PREFARM_AMOUNT * _corpochain_to_gwei),
             )
         )
         next_wd_index += 1
     
+    records = list(_walk_to_prev_tx_block(constants, prev_tx_block, blocks))
+    
     # Add block rewards
-    curr: BlockRecord = prev_tx_block
-    while True:
-        withdrawals.append(
-            WithdrawalV1(
-                next_wd_index,
-                uint64(1),
-                curr.coinbase,
-                _calculate_block_reward(curr.height),
-            )
-        )
-        next_wd_index += 1
-        
-        if curr.prev_hash == constants.GENESIS_CHALLENGE:
-            break
-        curr = blocks.block_record(curr.prev_hash)
-        if curr.is_transaction_block:
-            break
+    withdrawal = WithdrawalV1
+    block_reward = _calculate_block_reward
+    validator_index = _BLOCK_REWARD_VALIDATOR_INDEX
+    withdrawals.extend(
+        [
+            withdrawal(uint64(next_wd_index + i), validator_index, record.coinbase, block_reward(record.height))
+            for i, record in enumerate(records)
+        ]
+    )
     
     return withdrawals
 
+
+def _walk_to_prev_tx_block(
+    constants: ConsensusConstants,
+    start: BlockRecord,
+    blocks: BlockchainInterface,
+) -> Iterator[BlockRecord]:
+    """
+    Yields start and every block before it, until (but excluding) the previous transaction block or genesis.
+    The walk is bounded by the block cache size, since only cached block records can be looked up.
+    """
+    get_block_record = blocks.block_record
+    curr = start
+    for _ in range(constants.BLOCKS_CACHE_SIZE):
+        yield curr
+        if curr.prev_hash == constants.GENESIS_CHALLENGE:
+            return
+        curr = get_block_record(curr.prev_hash)
+        if curr.is_transaction_block:
+            return
+    raise RuntimeError(f"No transaction block within {constants.BLOCKS_CACHE_SIZE} blocks before {start.header_hash}")
+
+
 def _calculate_block_reward(
-    height: uint64
+    height: uint32
 ) -> uint64:
-    if height < 3 * _blocks_per_year:
-        return uint64(2 * _corpochain_to_gwei)
-    elif height < 6 * _blocks_per_year:
-        return uint64(1 * _corpochain_to_gwei)
-    elif height < 9 * _blocks_per_year:
-        return uint64(0.5 * _corpochain_to_gwei)
-    elif height < 12 * _blocks_per_year:
-        return uint64(0.25 * _corpochain_to_gwei)
-    elif height < 15 * _blocks_per_year:
-        return uint64(0.125 * _corpochain_to_gwei)
-    else:
-        return uint64(0)
+    return _REWARDS[bisect_right(_REWARD_BOUNDARIES, height)]
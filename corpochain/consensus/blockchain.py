@@ -1,18 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+import atexit
 import dataclasses
 import logging
 import multiprocessing
+import threading
 import traceback
-from concurrent.futures import Executor
-from concurrent.futures.process import ProcessPoolExecutor
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
 from enum import Enum
 from multiprocessing.context import BaseContext
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import DefaultDict, Dict, List, Optional, Set, Tuple
 
-from corpochain.consensus.block_body_validation import validate_block_body
+from corpochain.consensus.block_body_validation import needs_payload_validation, validate_block_body
 from corpochain.consensus.block_header_validation import validate_unfinished_header_block
 from corpochain.consensus.block_record import BlockRecord
 from corpochain.consensus.blockchain_interface import BlockchainInterface
@@ -22,10 +25,12 @@ from corpochain.consensus.find_fork_point import find_fork_point_in_chain
 from corpochain.consensus.full_block_to_block_record import block_to_block_record
 from corpochain.consensus.multiprocess_validation import (
     PreValidationResult,
+    init_validation_worker,
     pre_validate_blocks_multiprocessing,
 )
 from corpochain.beacon.block_height_map import BlockHeightMap
 from corpochain.beacon.block_store import BlockStore
+from corpochain.types.blockchain_format.execution_payload import PayloadStatus
 from corpochain.types.blockchain_format.sized_bytes import bytes32
 from corpochain.types.blockchain_format.sub_epoch_summary import SubEpochSummary
 from corpochain.types.blockchain_format.vdf import VDFInfo
@@ -35,15 +40,61 @@ from corpochain.types.header_block import HeaderBlock
 from corpochain.types.unfinished_block import UnfinishedBlock
 from corpochain.types.unfinished_header_block import UnfinishedHeaderBlock
 from corpochain.types.weight_proof import SubEpochChallengeSegment
+from corpochain.util.chunks import chunks
 from corpochain.util.errors import ConsensusError, Err
 from corpochain.util.generator_tools import get_block_header
 from corpochain.util.hash import std_hash
 from corpochain.util.inline_executor import InlineExecutor
 from corpochain.util.ints import uint16, uint32, uint64, uint128
-from corpochain.util.setproctitle import getproctitle, setproctitle
+from corpochain.util.lru_cache import LRUCache
+from corpochain.util.setproctitle import getproctitle
 
 log = logging.getLogger(__name__)
 
+# Number of compact proofs remembered by seen_compact_proofs
+_SEEN_COMPACT_PROOFS_MAX = 10000
+
+# Process pools are expensive to start, so they are shared by all Blockchain instances in the process. The workers
+# get the consensus constants once when they start, so pools are also keyed by the constants
+_validation_pools: Dict[Tuple[int, int, ConsensusConstants], ProcessPoolExecutor] = {}
+_validation_pools_lock = threading.Lock()
+
+
+def _shut_down_validation_pools() -> None:
+    with _validation_pools_lock:
+        for pool in _validation_pools.values():
+            pool.shutdown(wait=True)
+        _validation_pools.clear()
+
+
+def _get_validation_pool(
+    num_workers: int,
+    mp_context: Optional[BaseContext],
+    constants: ConsensusConstants,
+    broken_pool: Optional[ProcessPoolExecutor] = None,
+) -> ProcessPoolExecutor:
+    """
+    Returns the shared pool for these arguments. A broken_pool, whose worker died and which cannot be used anymore,
+    is replaced, unless another instance already did so.
+    """
+    key = (num_workers, id(mp_context), constants)
+    with _validation_pools_lock:
+        pool = _validation_pools.get(key)
+        if pool is None or pool is broken_pool:
+            if broken_pool is not None:
+                broken_pool.shutdown(wait=False)
+            if len(_validation_pools) == 0:
+                atexit.register(_shut_down_validation_pools)
+            pool = ProcessPoolExecutor(
+                max_workers=num_workers,
+                mp_context=mp_context,
+                initializer=init_validation_worker,
+                initargs=(f"{getproctitle()}_worker", constants),
+            )
+            _validation_pools[key] = pool
+            log.info(f"Started {num_workers} processes for block validation")
+        return pool
+
 
 class ReceiveBlockResult(Enum):
     """
@@ -71,10 +122,12 @@ class Blockchain(BlockchainInterface):
 
     # peak of the blockchain
     _peak_height: Optional[uint32]
+    # block record of the peak, updated together with _peak_height
+    _peak: Optional[BlockRecord]
     # All blocks in peak path are guaranteed to be included, can include orphan blocks
     __block_records: Dict[bytes32, BlockRecord]
     # all hashes of blocks in block_record by height, used for garbage collection
-    __heights_in_cache: Dict[uint32, Set[bytes32]]
+    __heights_in_cache: DefaultDict[uint32, Set[bytes32]]
     # maps block height (of the current heaviest chain) to block hash and sub
     # epoch summaries
     __height_map: BlockHeightMap
@@ -82,8 +135,14 @@ class Blockchain(BlockchainInterface):
     block_store: BlockStore
     # Used to verify blocks in parallel
     pool: Executor
-    # Set holding seen compact proofs, in order to avoid duplicates.
-    _seen_compact_proofs: Set[Tuple[VDFInfo, uint32]]
+    # Number of workers and multiprocessing context of a shared process pool, to replace it once it is broken
+    _validation_pool_args: Tuple[int, Optional[BaseContext]]
+    # Digests of recently seen compact proofs, in order to avoid duplicates.
+    _seen_compact_proofs: LRUCache[bytes32, bool]
+    # Next sub slot iters and difficulty by (prev header hash, new slot)
+    _sub_slot_iters_and_difficulty_cache: LRUCache[Tuple[bytes32, bool], Tuple[uint64, uint64]]
+    # Result of get_recent_reward_challenges, along with the peak it was computed for
+    _recent_rc_cache: Optional[Tuple[bytes32, List[Tuple[bytes32, uint128]]]]
 
     # Whether blockchain is shut down or not
     _shut_down: bool
@@ -102,6 +161,7 @@ class Blockchain(BlockchainInterface):
         multiprocessing_context: Optional[BaseContext] = None,
         *,
         single_threaded: bool = False,
+        validation_threads: bool = False,
     ) -> "Blockchain":
         """
         Initializes a blockchain with the BlockRecords from disk, assuming they have all been
@@ -118,25 +178,30 @@ class Blockchain(BlockchainInterface):
             if cpu_count > 61:
                 cpu_count = 61  # Windows Server 2016 has an issue https://bugs.python.org/issue26903
             num_workers = max(cpu_count - reserved_cores, 1)
-            self.pool = ProcessPoolExecutor(
-                max_workers=num_workers,
-                mp_context=multiprocessing_context,
-                initializer=setproctitle,
-                initargs=(f"{getproctitle()}_worker",),
-            )
-            log.info(f"Started {num_workers} processes for block validation")
+            if validation_threads:
+                # Threads avoid spawning workers and copying every batch over a pipe, but the header
+                # validation is still largely pure python, so this only pays off when the GIL is not the bottleneck
+                self.pool = ThreadPoolExecutor(max_workers=num_workers, thread_name_prefix="block-validate")
+                log.info(f"Started {num_workers} threads for block validation")
+            else:
+                self._validation_pool_args = (num_workers, multiprocessing_context)
+                self.pool = _get_validation_pool(num_workers, multiprocessing_context, consensus_constants)
 
         self.constants = consensus_constants
         self.block_store = block_store
         self.execution_client = execution_client
         self._shut_down = False
         await self._load_chain_from_store(blockchain_dir)
-        self._seen_compact_proofs = set()
+        self._seen_compact_proofs = LRUCache(_SEEN_COMPACT_PROOFS_MAX)
+        self._recent_rc_cache = None
+        self._sub_slot_iters_and_difficulty_cache = LRUCache(4096)
         return self
 
     def shut_down(self) -> None:
         self._shut_down = True
-        self.pool.shutdown(wait=True)
+        # The process pool is shared with other instances and is shut down at exit
+        if not isinstance(self.pool, ProcessPoolExecutor):
+            self.pool.shutdown(wait=True)
 
     async def _load_chain_from_store(self, blockchain_dir: Path) -> None:
         """
@@ -144,7 +209,7 @@ class Blockchain(BlockchainInterface):
         """
         self.__height_map = await BlockHeightMap.create(blockchain_dir, self.block_store.db_wrapper)
         self.__block_records = {}
-        self.__heights_in_cache = {}
+        self.__heights_in_cache = defaultdict(set)
         block_records, peak = await self.block_store.get_block_records_close_to_peak(self.constants.BLOCKS_CACHE_SIZE)
         for block in block_records.values():
             self.add_block_record(block)
@@ -152,10 +217,12 @@ class Blockchain(BlockchainInterface):
         if len(block_records) == 0:
             assert peak is None
             self._peak_height = None
+            self._peak = None
             return
 
         assert peak is not None
-        self._peak_height = self.block_record(peak).height
+        self._peak = self.block_record(peak)
+        self._peak_height = self._peak.height
         assert self.__height_map.contains_height(self._peak_height)
         assert not self.__height_map.contains_height(uint32(self._peak_height + 1))
 
@@ -163,9 +230,7 @@ class Blockchain(BlockchainInterface):
         """
         Return the peak of the blockchain
         """
-        if self._peak_height is None:
-            return None
-        return self.height_to_block_record(self._peak_height)
+        return self._peak
 
     async def get_full_peak(self) -> Optional[FullBlock]:
         if self._peak_height is None:
@@ -185,6 +250,7 @@ class Blockchain(BlockchainInterface):
         block: FullBlock,
         pre_validation_result: PreValidationResult,
         fork_point_with_peak: Optional[uint32] = None,
+        payload_status: Optional[PayloadStatus] = None,
     ) -> Tuple[ReceiveBlockResult, Optional[Err], Optional[StateChangeSummary]]:
         """
         This method must be called under the blockchain lock
@@ -197,6 +263,7 @@ class Blockchain(BlockchainInterface):
             block: The FullBlock to be validated.
             pre_validation_result: A result of successful pre validation
             fork_point_with_peak: The fork point, for efficiency reasons, if None, it will be recomputed
+            payload_status: Status of the execution payload, if it was already sent to the execution client
 
         Returns:
             The result of adding the block to the blockchain (NEW_PEAK, ADDED_AS_ORPHAN, INVALID_BLOCK,
@@ -207,41 +274,48 @@ class Blockchain(BlockchainInterface):
         """
 
         genesis: bool = block.height == 0
-        if self.contains_block(block.header_hash):
+        # header_hash is computed from the foliage on every access, so it is only done once
+        header_hash: bytes32 = block.header_hash
+        if header_hash in self.__block_records:
             return ReceiveBlockResult.ALREADY_HAVE_BLOCK, None, None
 
-        if not self.contains_block(block.prev_header_hash) and not genesis:
-            return ReceiveBlockResult.DISCONNECTED_BLOCK, Err.INVALID_PREV_BLOCK_HASH, None
-
-        if not genesis and (self.block_record(block.prev_header_hash).height + 1) != block.height:
-            return ReceiveBlockResult.INVALID_BLOCK, Err.INVALID_HEIGHT, None
+        if not genesis:
+            prev_b = self.__block_records.get(block.prev_header_hash)
+            if prev_b is None:
+                return ReceiveBlockResult.DISCONNECTED_BLOCK, Err.INVALID_PREV_BLOCK_HASH, None
+            if prev_b.height + 1 != block.height:
+                return ReceiveBlockResult.INVALID_BLOCK, Err.INVALID_HEIGHT, None
 
         required_iters = pre_validation_result.required_iters
         if pre_validation_result.error is not None:
             return ReceiveBlockResult.INVALID_BLOCK, Err(pre_validation_result.error), None
         assert required_iters is not None
         
-        block_record = block_to_block_record(
-            self.constants,
-            self,
-            required_iters,
-            block,
-            None,
-        )
+        block_record = pre_validation_result.block_record
+        if block_record is None or block_record.header_hash != header_hash:
+            block_record = block_to_block_record(
+                self.constants,
+                self,
+                required_iters,
+                block,
+                None,
+            )
 
-        error_code = await validate_block_body(
-            self.execution_client,
-            block,
-            block.height,
-            block_record,
-        )
+        error_code: Optional[Err] = None
+        if needs_payload_validation(block, block.height):
+            error_code = await validate_block_body(
+                self.execution_client,
+                block,
+                block.height,
+                block_record,
+                payload_status,
+            )
         if error_code is not None:
             return ReceiveBlockResult.INVALID_BLOCK, error_code, None
 
         # Always add the block to the database
         async with self.block_store.db_wrapper.writer():
             try:
-                header_hash: bytes32 = block.header_hash
                 # Perform the DB operations to update the state, and rollback if something goes wrong
                 await self.block_store.add_full_block(header_hash, block, block_record)
                 records, state_change_summary = await self._reconsider_peak(
@@ -262,7 +336,7 @@ class Blockchain(BlockchainInterface):
             except BaseException as e:
                 self.block_store.rollback_cache_block(header_hash)
                 log.error(
-                    f"Error while adding block {block.header_hash} height {block.height},"
+                    f"Error while adding block {header_hash} height {block.height},"
                     f" rolling back: {traceback.format_exc()} {e}"
                 )
                 raise
@@ -270,10 +344,13 @@ class Blockchain(BlockchainInterface):
         # make sure to update _peak_height after the transaction is committed,
         # otherwise other tasks may go look for this block before it's available
         if state_change_summary is not None:
+            self._peak = block_record
             self._peak_height = block_record.height
 
-        # This is done outside the try-except in case it fails, since we do not want to revert anything if it does
-        await self.__height_map.maybe_flush()
+        # This is done outside the try-except in case it fails, since we do not want to revert anything if it does.
+        # Checked synchronously first, since most blocks do not trigger a flush
+        if self.__height_map.needs_flush():
+            await self.__height_map.maybe_flush()
 
         if state_change_summary is not None:
             return ReceiveBlockResult.NEW_PEAK, None, state_change_summary
@@ -297,9 +374,6 @@ class Blockchain(BlockchainInterface):
 
         if genesis:
             if peak is None:
-                block: Optional[FullBlock] = await self.block_store.get_full_block(block_record.header_hash)
-                assert block is not None
-
                 await self.block_store.set_in_chain([(block_record.header_hash,)])
                 await self.block_store.set_peak(block_record.header_hash)
                 return [block_record], StateChangeSummary(
@@ -312,39 +386,25 @@ class Blockchain(BlockchainInterface):
             # This is not a heavier block than the heaviest we have seen
             return [], None
 
-        # Finds the fork. if the block is just being appended, it will return the peak
-        # If no blocks in common, returns -1, and reverts all blocks
+        hashes_to_add: List[bytes32]
+        records_to_add: List[BlockRecord]
         if block_record.prev_hash == peak.header_hash:
+            # The block is just being appended to the peak, so it is the only block to add
             fork_height: int = peak.height
-        elif fork_point_with_peak is not None:
-            fork_height = fork_point_with_peak
+            hashes_to_add = [block_record.header_hash]
+            records_to_add = [block_record]
         else:
-            fork_height = find_fork_point_in_chain(self, block_record, peak)
-
-        # Collects all blocks from fork point to new peak
-        blocks_to_add: List[Tuple[FullBlock, BlockRecord]] = []
-        curr = block_record.header_hash
-
-        # Backtracks up to the fork point, pulling all the required blocks from DB (that will soon be in the chain)
-        while fork_height < 0 or curr != self.height_to_hash(uint32(fork_height)):
-            fetched_full_block: Optional[FullBlock] = await self.block_store.get_full_block(curr)
-            fetched_block_record: Optional[BlockRecord] = await self.block_store.get_block_record(curr)
-            assert fetched_full_block is not None
-            assert fetched_block_record is not None
-            blocks_to_add.append((fetched_full_block, fetched_block_record))
-            if fetched_full_block.height == 0:
-                # Doing a full reorg, starting at height 0
-                break
-            curr = fetched_block_record.prev_hash
-
-        records_to_add: List[BlockRecord] = []
-        for fetched_full_block, fetched_block_record in reversed(blocks_to_add):
-            records_to_add.append(fetched_block_record)
+            # Finds the fork. If no blocks in common, returns -1, and reverts all blocks
+            if fork_point_with_peak is not None:
+                fork_height = fork_point_with_peak
+            else:
+                fork_height = find_fork_point_in_chain(self, block_record, peak)
+            hashes_to_add, records_to_add = await self._collect_fork_records(block_record, fork_height)
 
         # we made it to the end successfully
         # Rollback sub_epoch_summaries
         await self.block_store.rollback(fork_height)
-        await self.block_store.set_in_chain([(br.header_hash,) for br in records_to_add])
+        await self.block_store.set_in_chain([(hh,) for hh in hashes_to_add])
 
         # Changes the peak to be the new peak
         await self.block_store.set_peak(block_record.header_hash)
@@ -353,20 +413,73 @@ class Blockchain(BlockchainInterface):
             block_record, uint32(max(fork_height, 0))
         )
 
+    async def _collect_fork_records(
+        self, block_record: BlockRecord, fork_height: int
+    ) -> Tuple[List[bytes32], List[BlockRecord]]:
+        """
+        Returns the hashes and block records from the block after fork_height up to block_record, in height order.
+        """
+        # Backtracks up to the fork point, collecting the hashes of all the blocks that will soon be in the chain.
+        # Only the prev_hash is needed for this walk, so no block or block record is parsed here.
+        # The lookups must stay in this task (no asyncio.gather): the new block is only visible
+        # through the write connection held by receive_block, which other tasks do not share
+        fork_hash: Optional[bytes32] = None if fork_height < 0 else self.height_to_hash(uint32(fork_height))
+        hashes_to_add: List[bytes32] = []
+        curr = block_record.header_hash
+        prev = block_record.prev_hash
+        while curr != fork_hash:
+            hashes_to_add.append(curr)
+            if prev == self.constants.GENESIS_CHALLENGE:
+                # Doing a full reorg, starting at height 0
+                break
+            curr = prev
+            if curr != fork_hash:
+                [prev] = await self.prev_block_hash([curr])
+
+        # Fetches the block records for exactly that set, from the cache where possible and the DB in batches
+        hashes_to_add.reverse()
+        missing: List[bytes32] = [
+            hh for hh in hashes_to_add if hh != block_record.header_hash and hh not in self.__block_records
+        ]
+        fetched: Dict[bytes32, BlockRecord] = {block_record.header_hash: block_record}
+        for batch in chunks(missing, 900):
+            for fetched_block_record in await self.block_store.get_block_records_by_hash(batch):
+                fetched[fetched_block_record.header_hash] = fetched_block_record
+        records_to_add: List[BlockRecord] = [
+            fetched[hh] if hh in fetched else self.__block_records[hh] for hh in hashes_to_add
+        ]
+        return hashes_to_add, records_to_add
+
     def get_next_difficulty(self, header_hash: bytes32, new_slot: bool) -> uint64:
         assert self.contains_block(header_hash)
         curr = self.block_record(header_hash)
         if curr.height <= 2:
             return self.constants.DIFFICULTY_STARTING
 
-        return get_next_sub_slot_iters_and_difficulty(self.constants, new_slot, curr, self)[1]
+        return self._next_sub_slot_iters_and_difficulty(curr, new_slot)[1]
 
     def get_next_slot_iters(self, header_hash: bytes32, new_slot: bool) -> uint64:
         assert self.contains_block(header_hash)
         curr = self.block_record(header_hash)
         if curr.height <= 2:
             return self.constants.SUB_SLOT_ITERS_STARTING
-        return get_next_sub_slot_iters_and_difficulty(self.constants, new_slot, curr, self)[0]
+        return self._next_sub_slot_iters_and_difficulty(curr, new_slot)[0]
+
+    def _next_sub_slot_iters_and_difficulty(
+        self, prev_b: Optional[BlockRecord], new_slot: bool
+    ) -> Tuple[uint64, uint64]:
+        """
+        Memoized get_next_sub_slot_iters_and_difficulty. The result only depends on prev_b and its ancestors,
+        so entries never go stale and are keyed on the header hash.
+        """
+        if prev_b is None:
+            return get_next_sub_slot_iters_and_difficulty(self.constants, new_slot, prev_b, self)
+        key = (prev_b.header_hash, new_slot)
+        cached = self._sub_slot_iters_and_difficulty_cache.get(key)
+        if cached is None:
+            cached = get_next_sub_slot_iters_and_difficulty(self.constants, new_slot, prev_b, self)
+            self._sub_slot_iters_and_difficulty_cache.put(key, cached)
+        return cached
 
     async def get_sp_and_ip_sub_slots(
         self, header_hash: bytes32
@@ -374,19 +487,22 @@ class Blockchain(BlockchainInterface):
         block: Optional[FullBlock] = await self.block_store.get_full_block(header_hash)
         if block is None:
             return None
-        curr_br: BlockRecord = self.block_record(block.header_hash)
+        curr_br: BlockRecord = self.block_record(header_hash)
         is_overflow = curr_br.overflow
 
+        block_records = self.__block_records
         curr: Optional[FullBlock] = block
         assert curr is not None
         while True:
             if curr_br.first_in_sub_slot:
-                curr = await self.block_store.get_full_block(curr_br.header_hash)
-                assert curr is not None
+                # The requested block itself is already loaded
+                if curr_br.header_hash != header_hash:
+                    curr = await self.block_store.get_full_block(curr_br.header_hash)
+                    assert curr is not None
                 break
             if curr_br.height == 0:
                 break
-            curr_br = self.block_record(curr_br.prev_hash)
+            curr_br = block_records[curr_br.prev_hash]
 
         if len(curr.finished_sub_slots) == 0:
             # This means we got to genesis and still no sub-slots
@@ -402,20 +518,20 @@ class Blockchain(BlockchainInterface):
             # Have both sub-slots
             return curr.finished_sub_slots[-2], ip_sub_slot
 
-        prev_curr: Optional[FullBlock] = await self.block_store.get_full_block(curr.prev_header_hash)
-        if prev_curr is None:
-            assert curr.height == 0
+        prev_curr: Optional[FullBlock]
+        if curr.height == 0:
             prev_curr = curr
-            prev_curr_br = self.block_record(curr.header_hash)
         else:
-            prev_curr_br = self.block_record(curr.prev_header_hash)
-        assert prev_curr_br is not None
-        while prev_curr_br.height > 0:
-            if prev_curr_br.first_in_sub_slot:
-                prev_curr = await self.block_store.get_full_block(prev_curr_br.header_hash)
-                assert prev_curr is not None
-                break
-            prev_curr_br = self.block_record(prev_curr_br.prev_hash)
+            # Walks the records first, so only the block that is needed gets loaded
+            prev_curr_br = block_records[curr.prev_header_hash]
+            prev_curr_hash = prev_curr_br.header_hash
+            while prev_curr_br.height > 0:
+                if prev_curr_br.first_in_sub_slot:
+                    prev_curr_hash = prev_curr_br.header_hash
+                    break
+                prev_curr_br = block_records[prev_curr_br.prev_hash]
+            prev_curr = await self.block_store.get_full_block(prev_curr_hash)
+            assert prev_curr is not None
 
         if len(prev_curr.finished_sub_slots) == 0:
             return None, ip_sub_slot
@@ -425,22 +541,32 @@ class Blockchain(BlockchainInterface):
         peak = self.get_peak()
         if peak is None:
             return []
+        # The result only depends on the peak and its ancestors, so it is computed once per peak
+        cached = self._recent_rc_cache
+        if cached is not None and cached[0] == peak.header_hash:
+            return list(cached[1])
         recent_rc: List[Tuple[bytes32, uint128]] = []
+        max_recent = 2 * self.constants.MAX_SUB_SLOT_BLOCKS
+        block_records = self.__block_records
         curr: Optional[BlockRecord] = peak
-        while curr is not None and len(recent_rc) < 2 * self.constants.MAX_SUB_SLOT_BLOCKS:
-            if curr != peak:
+        while curr is not None and len(recent_rc) < max_recent:
+            # Identity check, comparing the dataclasses would compare every field
+            if curr is not peak:
                 recent_rc.append((curr.reward_infusion_new_challenge, curr.total_iters))
             if curr.first_in_sub_slot:
                 assert curr.finished_reward_slot_hashes is not None
+                sub_slot_iters = curr.sub_slot_iters
                 sub_slot_total_iters = curr.ip_sub_slot_total_iters(self.constants)
                 # Start from the most recent
                 for rc in reversed(curr.finished_reward_slot_hashes):
-                    if sub_slot_total_iters < curr.sub_slot_iters:
+                    if sub_slot_total_iters < sub_slot_iters:
                         break
                     recent_rc.append((rc, sub_slot_total_iters))
-                    sub_slot_total_iters = uint128(sub_slot_total_iters - curr.sub_slot_iters)
-            curr = self.try_block_record(curr.prev_hash)
-        return list(reversed(recent_rc))
+                    sub_slot_total_iters = uint128(sub_slot_total_iters - sub_slot_iters)
+            curr = block_records.get(curr.prev_hash)
+        recent_rc.reverse()
+        self._recent_rc_cache = (peak.header_hash, recent_rc)
+        return list(recent_rc)
 
     async def validate_unfinished_block_header(
         self, block: UnfinishedBlock, skip_overflow_ss_validation: bool = True
@@ -461,8 +587,8 @@ class Blockchain(BlockchainInterface):
             block.execution_payload,
         )
         prev_b = self.try_block_record(unfinished_header_block.prev_header_hash)
-        sub_slot_iters, difficulty = get_next_sub_slot_iters_and_difficulty(
-            self.constants, len(unfinished_header_block.finished_sub_slots) > 0, prev_b, self
+        sub_slot_iters, difficulty = self._next_sub_slot_iters_and_difficulty(
+            prev_b, len(unfinished_header_block.finished_sub_slots) > 0
         )
         required_iters, error = validate_unfinished_header_block(
             self.constants,
@@ -490,12 +616,14 @@ class Blockchain(BlockchainInterface):
             else self.block_record(block.prev_header_hash).height
         )
 
-        error_code = await validate_block_body(
-            self.execution_client,
-            block,
-            uint32(prev_height + 1),
-            None,
-        )
+        error_code: Optional[Err] = None
+        if needs_payload_validation(block, uint32(prev_height + 1)):
+            error_code = await validate_block_body(
+                self.execution_client,
+                block,
+                uint32(prev_height + 1),
+                None,
+            )
 
         if error_code is not None:
             return PreValidationResult(uint16(error_code.value), None)
@@ -508,14 +636,31 @@ class Blockchain(BlockchainInterface):
         batch_size: int = 4,
         wp_summaries: Optional[List[SubEpochSummary]] = None,
     ) -> List[PreValidationResult]:
-        return await pre_validate_blocks_multiprocessing(
-            self.constants,
-            self,
-            blocks,
-            self.pool,
-            batch_size,
-            wp_summaries,
-        )
+        try:
+            return await pre_validate_blocks_multiprocessing(
+                self.constants,
+                self,
+                blocks,
+                self.pool,
+                batch_size,
+                wp_summaries,
+                pool_has_constants=isinstance(self.pool, ProcessPoolExecutor),
+            )
+        except BrokenProcessPool:
+            # A worker of the process pool died. The pool is replaced and the blocks are validated again
+            assert isinstance(self.pool, ProcessPoolExecutor)
+            log.warning("Block validation process pool is broken, starting a new one")
+            num_workers, multiprocessing_context = self._validation_pool_args
+            self.pool = _get_validation_pool(num_workers, multiprocessing_context, self.constants, self.pool)
+            return await pre_validate_blocks_multiprocessing(
+                self.constants,
+                self,
+                blocks,
+                self.pool,
+                batch_size,
+                wp_summaries,
+                pool_has_constants=True,
+            )
 
     def contains_block(self, header_hash: bytes32) -> bool:
         """
@@ -527,6 +672,9 @@ class Blockchain(BlockchainInterface):
     def block_record(self, header_hash: bytes32) -> BlockRecord:
         return self.__block_records[header_hash]
 
+    def try_block_record(self, header_hash: bytes32) -> Optional[BlockRecord]:
+        return self.__block_records.get(header_hash)
+
     def height_to_block_record(self, height: uint32) -> BlockRecord:
         # Precondition: height is in the blockchain
         header_hash: Optional[bytes32] = self.height_to_hash(height)
@@ -541,9 +689,7 @@ class Blockchain(BlockchainInterface):
         return self.__height_map.get_ses(height)
 
     def height_to_hash(self, height: uint32) -> Optional[bytes32]:
-        if not self.__height_map.contains_height(height):
-            return None
-        return self.__height_map.get_hash(height)
+        return self.__height_map.try_get_hash(height)
 
     def contains_height(self, height: uint32) -> bool:
         return self.__height_map.contains_height(height)
@@ -576,16 +722,23 @@ class Blockchain(BlockchainInterface):
         """
         if height < 0:
             return None
-        blocks_to_remove = self.__heights_in_cache.get(uint32(height), None)
-        while blocks_to_remove is not None and height >= 0:
-            for header_hash in blocks_to_remove:
-                del self.__block_records[header_hash]  # remove from blocks
-            del self.__heights_in_cache[uint32(height)]  # remove height from heights in cache
-
-            if height == 0:
+        # The cache holds a contiguous range of heights, so walk down from height until the first missing one
+        to_remove: Set[bytes32] = set()
+        heights_in_cache = self.__heights_in_cache
+        while height >= 0:
+            blocks_to_remove = heights_in_cache.pop(uint32(height), None)
+            if blocks_to_remove is None:
                 break
-            height = height - 1
-            blocks_to_remove = self.__heights_in_cache.get(uint32(height), None)
+            to_remove.update(blocks_to_remove)
+            height -= 1
+
+        if len(to_remove) > len(self.__block_records) // 2:
+            # Rebuilding is cheaper than deleting most of the keys, and it also releases the memory of the old dict
+            self.__block_records = {k: v for k, v in self.__block_records.items() if k not in to_remove}
+        else:
+            block_records = self.__block_records
+            for header_hash in to_remove:
+                block_records.pop(header_hash, None)
 
     def clean_block_records(self) -> None:
         """
@@ -609,19 +762,26 @@ class Blockchain(BlockchainInterface):
         self, start: int, stop: int
     ) -> Dict[bytes32, HeaderBlock]:
         hashes = []
+        try_get_hash = self.__height_map.try_get_hash
         for height in range(start, stop + 1):
-            header_hash: Optional[bytes32] = self.height_to_hash(uint32(height))
-            if header_hash is not None:
-                hashes.append(header_hash)
+            header_hash: Optional[bytes32] = try_get_hash(uint32(height))
+            if header_hash is None:
+                # Every height above this one is missing too
+                break
+            hashes.append(header_hash)
 
         blocks: List[FullBlock] = []
-        for hash in hashes.copy():
-            block = self.block_store.block_cache.get(hash)
+        missing: List[bytes32] = []
+        block_cache = self.block_store.block_cache
+        for hash in hashes:
+            block = block_cache.get(hash)
             if block is not None:
                 blocks.append(block)
-                hashes.remove(hash)
-        blocks_on_disk: List[FullBlock] = await self.block_store.get_blocks_by_hash(hashes)
-        blocks.extend(blocks_on_disk)
+            else:
+                missing.append(hash)
+        if len(missing) > 0:
+            blocks_on_disk: List[FullBlock] = await self.block_store.get_blocks_by_hash(missing)
+            blocks.extend(blocks_on_disk)
         header_blocks: Dict[bytes32, HeaderBlock] = {}
 
         for block in blocks:
@@ -669,6 +829,22 @@ class Blockchain(BlockchainInterface):
             return self.__block_records[header_hash]
         return await self.block_store.get_block_record(header_hash)
 
+    async def prev_block_hash(self, header_hashes: List[bytes32]) -> List[bytes32]:
+        """
+        Returns the prev_hash of each block, from the cache where possible and from the DB otherwise
+        """
+        prev_hashes: Dict[bytes32, bytes32] = {}
+        missing: List[bytes32] = []
+        for header_hash in header_hashes:
+            cached = self.__block_records.get(header_hash)
+            if cached is not None:
+                prev_hashes[header_hash] = cached.prev_hash
+            else:
+                missing.append(header_hash)
+        if len(missing) > 0:
+            prev_hashes.update(zip(missing, await self.block_store.prev_block_hash(missing)))
+        return [prev_hashes[header_hash] for header_hash in header_hashes]
+
     def remove_block_record(self, header_hash: bytes32) -> None:
         sbr = self.block_record(header_hash)
         del self.__block_records[header_hash]
@@ -679,10 +855,9 @@ class Blockchain(BlockchainInterface):
         Adds a block record to the cache.
         """
 
-        self.__block_records[block_record.header_hash] = block_record
-        if block_record.height not in self.__heights_in_cache.keys():
-            self.__heights_in_cache[block_record.height] = set()
-        self.__heights_in_cache[block_record.height].add(block_record.header_hash)
+        header_hash = block_record.header_hash
+        self.__block_records[header_hash] = block_record
+        self.__heights_in_cache[block_record.height].add(header_hash)
 
     async def persist_sub_epoch_challenge_segments(
         self, ses_block_hash: bytes32, segments: List[SubEpochChallengeSegment]
@@ -702,11 +877,10 @@ class Blockchain(BlockchainInterface):
 
     # Returns 'True' if the info is already in the set, otherwise returns 'False' and stores it.
     def seen_compact_proofs(self, vdf_info: VDFInfo, height: uint32) -> bool:
-        pot_tuple = (vdf_info, height)
-        if pot_tuple in self._seen_compact_proofs:
+        # Only a digest is kept, so the set does not hold on to the VDFInfo objects of every proof it has seen
+        pot_key = std_hash(bytes(vdf_info) + height.to_bytes(4, "big"))
+        if self._seen_compact_proofs.get(pot_key) is not None:
             return True
-        # Periodically cleanup to keep size small. TODO: make this smarter, like FIFO.
-        if len(self._seen_compact_proofs) > 10000:
-            self._seen_compact_proofs.clear()
-        self._seen_compact_proofs.add(pot_tuple)
+        # The least recently seen proofs are evicted to keep the size small
+        self._seen_compact_proofs.put(pot_key, True)
         return False
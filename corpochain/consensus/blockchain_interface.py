@@ -57,6 +57,10 @@ class BlockchainInterface:
     async def get_block_record_from_db(self, header_hash: bytes32) -> Optional[BlockRecord]:
         pass
 
+    async def prev_block_hash(self, header_hashes: List[bytes32]) -> List[bytes32]:
+        # ignoring hinting error until we handle our interfaces more formally
+        return  # type: ignore[return-value]
+
     async def get_block_records_in_range(self, start: int, stop: int) -> Dict[bytes32, BlockRecord]:
         # ignoring hinting error until we handle our interfaces more formally
         return  # type: ignore[return-value]
@@ -62,7 +62,7 @@ class ConsensusConstants:
 
         filtered_changes = {}
         for k, v in changes.items():
-            if not hasattr(self, k):
+            if k not in _FIELD_NAMES:
                 # NETWORK_TYPE used to be present in default config, but has been removed
                 if k not in ["NETWORK_TYPE"]:
                     log.warning(f'invalid key in network configuration (config.yaml) "{k}". Ignoring')
@@ -73,3 +73,7 @@ class ConsensusConstants:
                 filtered_changes[k] = v
 
         return dataclasses.replace(self, **filtered_changes)
+
+
+# Only actual fields can be overridden, hasattr would also accept the methods
+_FIELD_NAMES = frozenset(field.name for field in dataclasses.fields(ConsensusConstants))
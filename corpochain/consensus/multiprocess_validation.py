@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import traceback
 from concurrent.futures import Executor
+from concurrent.futures.process import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence
 
 from blspy import AugSchemeMPL, G1Element
 
@@ -17,7 +17,13 @@ from corpochain.consensus.difficulty_adjustment import get_next_sub_slot_iters_a
 from corpochain.consensus.full_block_to_block_record import block_to_block_record
 from corpochain.consensus.get_block_challenge import get_block_challenge
 from corpochain.consensus.pot_iterations import calculate_iterations_quality, is_overflow_block
-from corpochain.types.blockchain_format.proof_of_space import verify_and_get_quality_string
+from corpochain.types.blockchain_format.proof_of_space import (
+    ProofOfSpace,
+    get_plot_id,
+    get_quality_string,
+    pos_has_valid_shape,
+    verify_pos_challenge,
+)
 from corpochain.types.blockchain_format.sized_bytes import bytes32
 from corpochain.types.blockchain_format.sub_epoch_summary import SubEpochSummary
 from corpochain.types.full_block import FullBlock
@@ -27,80 +33,152 @@ from corpochain.util.block_cache import BlockCache
 from corpochain.util.generator_tools import get_block_header
 from corpochain.util.errors import Err, ValidationError
 from corpochain.util.ints import uint16, uint32, uint64
+from corpochain.util.lru_cache import LRUCache
+from corpochain.util.setproctitle import setproctitle
 from corpochain.util.streamable import Streamable, streamable
 
 log = logging.getLogger(__name__)
 
+# Consensus constants of a validation worker process, set once by init_validation_worker so they are not sent with
+# every batch
+_worker_constants: Optional[ConsensusConstants] = None
+# Block records already parsed by a validation worker process. Consecutive batches share almost all of their recent
+# blocks, and a header hash always maps to the same record, so they are only parsed once
+_worker_block_records: Optional[LRUCache[bytes, BlockRecord]] = None
+_WORKER_BLOCK_RECORDS_MAX = 4096
+
+
+def init_validation_worker(process_title: str, constants: ConsensusConstants) -> None:
+    global _worker_constants, _worker_block_records
+    setproctitle(process_title)
+    _worker_constants = constants
+    _worker_block_records = LRUCache(_WORKER_BLOCK_RECORDS_MAX)
+
 
 @streamable
 @dataclass(frozen=True)
 class PreValidationResult(Streamable):
     error: Optional[uint16]
     required_iters: Optional[uint64]  # Iff error is None
+    block_record: Optional[BlockRecord] = None  # The record computed during pre validation, if error is None
 
 
 def batch_pre_validate_blocks(
-    constants: ConsensusConstants,
+    constants: Optional[ConsensusConstants],
     blocks_pickled: Dict[bytes, bytes],
     full_blocks_pickled: Optional[List[bytes]],
     header_blocks_pickled: Optional[List[bytes]],
     expected_difficulty: List[uint64],
     expected_sub_slot_iters: List[uint64],
 ) -> List[bytes]:
+    if (full_blocks_pickled is None) == (header_blocks_pickled is None):
+        raise ValueError("Exactly one of full_blocks_pickled and header_blocks_pickled should be passed here")
+    if constants is None:
+        # The worker was started by init_validation_worker
+        assert _worker_constants is not None
+        constants = _worker_constants
     blocks: Dict[bytes32, BlockRecord] = {}
+    parsed_records = _worker_block_records
     for k, v in blocks_pickled.items():
-        blocks[bytes32(k)] = BlockRecord.from_bytes(v)
-    results: List[PreValidationResult] = []
-    if full_blocks_pickled is not None and header_blocks_pickled is not None:
-        assert ValueError("Only one should be passed here")
-
+        if parsed_records is None:
+            blocks[bytes32(k)] = BlockRecord.from_bytes(v)
+            continue
+        block_record = parsed_records.get(k)
+        if block_record is None:
+            block_record = BlockRecord.from_bytes(v)
+            parsed_records.put(k, block_record)
+        blocks[bytes32(k)] = block_record
+    # A block that cannot be deserialized is passed on as None, and gets an error like any other failing block
+    header_blocks: List[Optional[HeaderBlock]] = []
     # In this case, we are validating full blocks, not headers
     if full_blocks_pickled is not None:
-        for i in range(len(full_blocks_pickled)):
+        for full_block_bytes in full_blocks_pickled:
             try:
-                block: FullBlock = FullBlock.from_bytes(full_blocks_pickled[i])
-                header_block = get_block_header(block)
-                required_iters, error = validate_finished_header_block(
-                    constants,
-                    BlockCache(blocks),
-                    header_block,
-                    expected_difficulty[i],
-                    expected_sub_slot_iters[i],
-                )
-                error_int: Optional[uint16] = None
-                if error is not None:
-                    error_int = uint16(error.code.value)
-
-                results.append(
-                    PreValidationResult(error_int, required_iters)
-                )
+                header_blocks.append(get_block_header(FullBlock.from_bytes(full_block_bytes)))
             except Exception:
-                error_stack = traceback.format_exc()
-                log.error(f"Exception: {error_stack}")
-                results.append(PreValidationResult(uint16(Err.UNKNOWN.value), None))
+                log.exception("Exception while pre-validating a block")
+                header_blocks.append(None)
     # In this case, we are validating header blocks
     elif header_blocks_pickled is not None:
-        for i in range(len(header_blocks_pickled)):
+        for header_block_bytes in header_blocks_pickled:
             try:
-                header_block = HeaderBlock.from_bytes(header_blocks_pickled[i])
-                required_iters, error = validate_finished_header_block(
-                    constants,
-                    BlockCache(blocks),
-                    header_block,
-                    expected_difficulty[i],
-                    expected_sub_slot_iters[i],
-                )
-                error_int = None
-                if error is not None:
-                    error_int = uint16(error.code.value)
-                results.append(PreValidationResult(error_int, required_iters))
+                header_blocks.append(HeaderBlock.from_bytes(header_block_bytes))
             except Exception:
-                error_stack = traceback.format_exc()
-                log.error(f"Exception: {error_stack}")
-                results.append(PreValidationResult(uint16(Err.UNKNOWN.value), None))
+                log.exception("Exception while pre-validating a block")
+                header_blocks.append(None)
+    results = _validate_header_blocks(constants, blocks, header_blocks, expected_difficulty, expected_sub_slot_iters)
     return [bytes(r) for r in results]
 
 
+def batch_pre_validate_blocks_in_process(
+    constants: ConsensusConstants,
+    blocks: Dict[bytes32, BlockRecord],
+    full_blocks: Sequence[FullBlock],
+    expected_difficulty: List[uint64],
+    expected_sub_slot_iters: List[uint64],
+) -> List[PreValidationResult]:
+    """
+    Same as batch_pre_validate_blocks, for executors that run in this process (threads or inline), which can use the
+    objects as they are instead of serializing them.
+    """
+    header_blocks: List[Optional[HeaderBlock]] = []
+    for block in full_blocks:
+        try:
+            header_blocks.append(get_block_header(block))
+        except Exception:
+            log.exception("Exception while pre-validating a block")
+            header_blocks.append(None)
+    return _validate_header_blocks(constants, blocks, header_blocks, expected_difficulty, expected_sub_slot_iters)
+
+
+def _validate_header_blocks(
+    constants: ConsensusConstants,
+    blocks: Dict[bytes32, BlockRecord],
+    header_blocks: Sequence[Optional[HeaderBlock]],
+    expected_difficulty: List[uint64],
+    expected_sub_slot_iters: List[uint64],
+) -> List[PreValidationResult]:
+    """
+    Validates the header blocks of a batch, with one BlockCache over the records for the whole batch. None stands for
+    a block that could not be deserialized.
+    """
+    block_cache = BlockCache(blocks)
+    results: List[PreValidationResult] = []
+    for i, header_block in enumerate(header_blocks):
+        if header_block is None:
+            results.append(PreValidationResult(uint16(Err.UNKNOWN.value), None))
+            continue
+        try:
+            required_iters, error = validate_finished_header_block(
+                constants,
+                block_cache,
+                header_block,
+                expected_difficulty[i],
+                expected_sub_slot_iters[i],
+            )
+            error_int: Optional[uint16] = None
+            if error is not None:
+                error_int = uint16(error.code.value)
+            results.append(PreValidationResult(error_int, required_iters))
+        except Exception:
+            log.exception("Exception while pre-validating a block")
+            results.append(PreValidationResult(uint16(Err.UNKNOWN.value), None))
+    return results
+
+
+def batch_get_quality_strings(
+    pos_pickled: List[bytes], min_plot_size: int, max_plot_size: int
+) -> List[Optional[bytes32]]:
+    results: List[Optional[bytes32]] = []
+    for pos_bytes in pos_pickled:
+        pos = ProofOfSpace.from_bytes(pos_bytes)
+        if not pos_has_valid_shape(pos, min_plot_size, max_plot_size):
+            results.append(None)
+            continue
+        results.append(get_quality_string(pos, get_plot_id(pos)))
+    return results
+
+
 async def pre_validate_blocks_multiprocessing(
     constants: ConsensusConstants,
     block_records: BlockchainInterface,
@@ -108,6 +186,8 @@ async def pre_validate_blocks_multiprocessing(
     pool: Executor,
     batch_size: int,
     wp_summaries: Optional[List[SubEpochSummary]] = None,
+    *,
+    pool_has_constants: bool = False,
 ) -> List[PreValidationResult]:
     """
     This method must be called under the blockchain lock
@@ -120,154 +200,222 @@ async def pre_validate_blocks_multiprocessing(
         constants:
         block_records:
         blocks: list of full blocks to validate (must be connected to current chain)
+        pool_has_constants: whether the workers of the pool were started by init_validation_worker with these constants
     """
     prev_b: Optional[BlockRecord] = None
+    # Threads and the inline executor run in this process, so they get the objects instead of serialized copies
+    in_process = not isinstance(pool, ProcessPoolExecutor)
     # Collects all the recent blocks (up to the previous sub-epoch)
     recent_blocks: Dict[bytes32, BlockRecord] = {}
-    recent_blocks_compressed: Dict[bytes32, BlockRecord] = {}
+    # Serialized forms of the recent blocks for the workers, kept up to date as records are added so every batch
+    # does not serialize them all again. The compressed one only has what is needed if no sub-slot ends in a batch
+    recent_blocks_pickled: Dict[bytes, bytes] = {}
+    recent_blocks_compressed_pickled: Dict[bytes, bytes] = {}
+
+    def add_recent_block(block_rec: BlockRecord, compressed: bool) -> None:
+        recent_blocks[block_rec.header_hash] = block_rec
+        if in_process:
+            return
+        key = bytes(block_rec.header_hash)
+        value = bytes(block_rec)
+        recent_blocks_pickled[key] = value
+        if compressed:
+            recent_blocks_compressed_pickled[key] = value
+
     num_sub_slots_found = 0
     num_blocks_seen = 0
     if blocks[0].height > 0:
-        if not block_records.contains_block(blocks[0].prev_header_hash):
+        first_prev_b = block_records.try_block_record(blocks[0].prev_header_hash)
+        if first_prev_b is None:
             return [PreValidationResult(uint16(Err.INVALID_PREV_BLOCK_HASH.value), None)]
-        curr = block_records.block_record(blocks[0].prev_header_hash)
+        # The first block is validated against this record, so the loop below does not look it up again
+        prev_b = first_prev_b
+        curr = first_prev_b
         num_sub_slots_to_look_for = 3 if curr.overflow else 2
-        while (
-            curr.sub_epoch_summary_included is None
-            or num_blocks_seen < constants.NUMBER_OF_TIMESTAMPS
-            or num_sub_slots_found < num_sub_slots_to_look_for
-        ) and curr.height > 0:
-            if num_blocks_seen < constants.NUMBER_OF_TIMESTAMPS or num_sub_slots_found < num_sub_slots_to_look_for:
-                recent_blocks_compressed[curr.header_hash] = curr
+        number_of_timestamps = constants.NUMBER_OF_TIMESTAMPS
+        get_block_record = block_records.block_record
+        while curr.height > 0:
+            # The compressed records are the ones every batch needs, the walk goes on until the sub-epoch start
+            compressed = num_blocks_seen < number_of_timestamps or num_sub_slots_found < num_sub_slots_to_look_for
+            if not compressed and curr.sub_epoch_summary_included is not None:
+                break
 
             if curr.first_in_sub_slot:
                 assert curr.finished_challenge_slot_hashes is not None
                 num_sub_slots_found += len(curr.finished_challenge_slot_hashes)
-            recent_blocks[curr.header_hash] = curr
+            add_recent_block(curr, compressed)
             if curr.is_transaction_block:
                 num_blocks_seen += 1
-            curr = block_records.block_record(curr.prev_hash)
-        recent_blocks[curr.header_hash] = curr
-        recent_blocks_compressed[curr.header_hash] = curr
-    block_record_was_present = []
-    for block in blocks:
-        block_record_was_present.append(block_records.contains_block(block.header_hash))
-
-    diff_ssis: List[Tuple[uint64, uint64]] = []
-    for block in blocks:
-        if block.height != 0:
-            assert block_records.contains_block(block.prev_header_hash)
-            if prev_b is None:
-                prev_b = block_records.block_record(block.prev_header_hash)
-
-        sub_slot_iters, difficulty = get_next_sub_slot_iters_and_difficulty(
-            constants, len(block.finished_sub_slots) > 0, prev_b, block_records
-        )
+            curr = get_block_record(curr.prev_hash)
+        add_recent_block(curr, True)
+    # Filled in the loop below, for the blocks that were prepared so far
+    block_record_was_present: List[bool] = []
 
-        overflow = is_overflow_block(constants, block.reward_chain_block.signage_point_index)
-        challenge = get_block_challenge(constants, block, BlockCache(recent_blocks), prev_b is None, overflow, False)
-        if block.reward_chain_block.challenge_chain_sp_vdf is None:
-            cc_sp_hash: bytes32 = challenge
-        else:
-            cc_sp_hash = block.reward_chain_block.challenge_chain_sp_vdf.output.get_hash()
-        q_str: Optional[bytes32] = verify_and_get_quality_string(
-            block.reward_chain_block.proof_of_space, constants, challenge, cc_sp_hash
-        )
-        if q_str is None:
-            for i, block_i in enumerate(blocks):
-                if not block_record_was_present[i] and block_records.contains_block(block_i.header_hash):
-                    block_records.remove_block_record(block_i.header_hash)
-            return [PreValidationResult(uint16(Err.INVALID_POSPACE.value), None)]
-
-        required_iters: uint64 = calculate_iterations_quality(
-            constants.DIFFICULTY_CONSTANT_FACTOR,
-            q_str,
-            block.reward_chain_block.proof_of_space.size,
-            difficulty,
-            cc_sp_hash,
-        )
+    futures: List[asyncio.Future[List[bytes]]] = []
+    in_process_futures: List[asyncio.Future[List[PreValidationResult]]] = []
 
-        try:
-            block_rec = block_to_block_record(
-                constants,
-                block_records,
-                required_iters,
-                block,
-                None,
-                sub_slot_iters,
-            )
-        except ValueError:
-            return [PreValidationResult(uint16(Err.INVALID_SUB_EPOCH_SUMMARY.value), None)]
-
-        if block_rec.sub_epoch_summary_included is not None and wp_summaries is not None:
-            idx = int(block.height / constants.SUB_EPOCH_BLOCKS) - 1
-            next_ses = wp_summaries[idx]
-            if not block_rec.sub_epoch_summary_included.get_hash() == next_ses.get_hash():
-                log.error("sub_epoch_summary does not match wp sub_epoch_summary list")
-                return [PreValidationResult(uint16(Err.INVALID_SUB_EPOCH_SUMMARY.value), None)]
-        # Makes sure to not override the valid blocks already in block_records
-        if not block_records.contains_block(block_rec.header_hash):
-            block_records.add_block_record(block_rec)  # Temporarily add block to dict
-            recent_blocks[block_rec.header_hash] = block_rec
-            recent_blocks_compressed[block_rec.header_hash] = block_rec
-        else:
-            recent_blocks[block_rec.header_hash] = block_records.block_record(block_rec.header_hash)
-            recent_blocks_compressed[block_rec.header_hash] = block_records.block_record(block_rec.header_hash)
-        prev_b = block_rec
-        diff_ssis.append((difficulty, sub_slot_iters))
-
-    block_dict: Dict[bytes32, FullBlock] = {}
-    for i, block in enumerate(blocks):
-        block_dict[block.header_hash] = block
-        if not block_record_was_present[i]:
-            block_records.remove_block_record(block.header_hash)
-
-    recent_sb_compressed_pickled = {bytes(k): bytes(v) for k, v in recent_blocks_compressed.items()}
-    futures = []
-    # Pool of workers to validate blocks concurrently
-    for i in range(0, len(blocks), batch_size):
-        end_i = min(i + batch_size, len(blocks))
+    def dispatch_batch(i: int, end_i: int) -> None:
+        # Hands a batch to the pool as soon as its blocks are prepared, so the workers validate it while the
+        # following blocks are still being prepared. Only the records up to this batch are needed by the workers
         blocks_to_validate = blocks[i:end_i]
-        if any([len(block.finished_sub_slots) > 0 for block in blocks_to_validate]):
-            final_pickled = {bytes(k): bytes(v) for k, v in recent_blocks.items()}
+        if in_process:
+            in_process_futures.append(
+                asyncio.get_running_loop().run_in_executor(
+                    pool,
+                    batch_pre_validate_blocks_in_process,
+                    constants,
+                    dict(recent_blocks),
+                    blocks_to_validate,
+                    expected_difficulties[i:end_i],
+                    expected_sub_slot_iters[i:end_i],
+                )
+            )
+            return
+        # Shallow copies, since the dicts keep growing while the pool may still be reading them
+        if any(len(block.finished_sub_slots) > 0 for block in blocks_to_validate):
+            final_pickled = dict(recent_blocks_pickled)
         else:
-            final_pickled = recent_sb_compressed_pickled
-        b_pickled: Optional[List[bytes]] = None
-        hb_pickled: Optional[List[bytes]] = None
-        for block in blocks_to_validate:
-            # We ONLY add blocks which are in the past, based on header hashes (which are validated later) to the
-            # prev blocks dict. This is important since these blocks are assumed to be valid
-            prev_blocks_dict: Dict[bytes32, FullBlock] = {}
-            curr_b: FullBlock = block
-
-            while curr_b.prev_header_hash in block_dict:
-                curr_b = block_dict[curr_b.prev_header_hash]
-                prev_blocks_dict[curr_b.header_hash] = curr_b
-
-            if isinstance(block, FullBlock):
-                if b_pickled is None:
-                    b_pickled = []
-                b_pickled.append(bytes(block))
-            else:
-                if hb_pickled is None:
-                    hb_pickled = []
-                hb_pickled.append(bytes(block))
-
+            final_pickled = dict(recent_blocks_compressed_pickled)
         futures.append(
             asyncio.get_running_loop().run_in_executor(
                 pool,
                 batch_pre_validate_blocks,
-                constants,
+                None if pool_has_constants else constants,
                 final_pickled,
-                b_pickled,
-                hb_pickled,
-                [diff_ssis[j][0] for j in range(i, end_i)],
-                [diff_ssis[j][1] for j in range(i, end_i)],
+                [bytes(block) for block in blocks_to_validate],
+                None,
+                expected_difficulties[i:end_i],
+                expected_sub_slot_iters[i:end_i],
             )
         )
-    # Collect all results into one flat list
-    return [
-        PreValidationResult.from_bytes(result)
-        for batch_result in (await asyncio.gather(*futures))
-        for result in batch_result
+
+    def cancel_dispatched_batches() -> None:
+        for future in futures:
+            future.cancel()
+        for in_process_future in in_process_futures:
+            in_process_future.cancel()
+
+    def abort(error: Err) -> List[PreValidationResult]:
+        # The batches that were already dispatched are not needed anymore
+        cancel_dispatched_batches()
+        return [PreValidationResult(uint16(error.value), None)]
+
+    # Verifying a proof of space only depends on the proof itself, so the proofs of all blocks are verified in the
+    # pool up front, and the serial loop below only does the cheap checks that depend on the previous blocks
+    quality_futures = [
+        asyncio.get_running_loop().run_in_executor(
+            pool,
+            batch_get_quality_strings,
+            [bytes(block.reward_chain_block.proof_of_space) for block in blocks[i : i + batch_size]],
+            constants.MIN_PLOT_SIZE,
+            constants.MAX_PLOT_SIZE,
+        )
+        for i in range(0, len(blocks), batch_size)
+    ]
+    quality_strings: List[Optional[bytes32]] = [
+        q_str for batch_result in await asyncio.gather(*quality_futures) for q_str in batch_result
     ]
+
+    expected_difficulties: List[uint64] = []
+    expected_sub_slot_iters: List[uint64] = []
+    block_recs: List[BlockRecord] = []
+    # BlockCache refers to recent_blocks rather than copying it, so it sees the records added in the loop
+    recent_blocks_cache = BlockCache(recent_blocks)
+    batch_start = 0
+    try:
+        for block_idx, block in enumerate(blocks):
+            # Checked before the temporary record of this block is added below
+            block_record_was_present.append(block_records.contains_block(block.header_hash))
+            if block.height != 0:
+                assert block_records.contains_block(block.prev_header_hash)
+                if prev_b is None:
+                    prev_b = block_records.block_record(block.prev_header_hash)
+
+            sub_slot_iters, difficulty = get_next_sub_slot_iters_and_difficulty(
+                constants, len(block.finished_sub_slots) > 0, prev_b, block_records
+            )
+
+            overflow = is_overflow_block(constants, block.reward_chain_block.signage_point_index)
+            challenge = get_block_challenge(constants, block, recent_blocks_cache, prev_b is None, overflow, False)
+            if block.reward_chain_block.challenge_chain_sp_vdf is None:
+                cc_sp_hash: bytes32 = challenge
+            else:
+                cc_sp_hash = block.reward_chain_block.challenge_chain_sp_vdf.output.get_hash()
+            # The proof itself was already checked in the pool, only the checks that depend on the chain remain
+            q_str: Optional[bytes32] = None
+            pos = block.reward_chain_block.proof_of_space
+            if verify_pos_challenge(pos, constants, challenge, cc_sp_hash) is not None:
+                q_str = quality_strings[block_idx]
+            if q_str is None:
+                return abort(Err.INVALID_POSPACE)
+
+            required_iters: uint64 = calculate_iterations_quality(
+                constants.DIFFICULTY_CONSTANT_FACTOR,
+                q_str,
+                block.reward_chain_block.proof_of_space.size,
+                difficulty,
+                cc_sp_hash,
+            )
+
+            try:
+                block_rec = block_to_block_record(
+                    constants,
+                    block_records,
+                    required_iters,
+                    block,
+                    None,
+                    sub_slot_iters,
+                )
+            except ValueError:
+                return abort(Err.INVALID_SUB_EPOCH_SUMMARY)
+
+            if block_rec.sub_epoch_summary_included is not None and wp_summaries is not None:
+                idx = int(block.height / constants.SUB_EPOCH_BLOCKS) - 1
+                next_ses = wp_summaries[idx]
+                # Field equality is the same as comparing the hashes of the serialized summaries, without hashing
+                if block_rec.sub_epoch_summary_included != next_ses:
+                    log.error("sub_epoch_summary does not match wp sub_epoch_summary list")
+                    return abort(Err.INVALID_SUB_EPOCH_SUMMARY)
+            # Makes sure to not override the valid blocks already in block_records
+            if not block_records.contains_block(block_rec.header_hash):
+                block_records.add_block_record(block_rec)  # Temporarily add block to dict
+                add_recent_block(block_rec, True)
+            else:
+                add_recent_block(block_records.block_record(block_rec.header_hash), True)
+            prev_b = block_rec
+            block_recs.append(block_rec)
+            expected_difficulties.append(difficulty)
+            expected_sub_slot_iters.append(sub_slot_iters)
+            if len(block_recs) - batch_start == batch_size:
+                dispatch_batch(batch_start, len(block_recs))
+                batch_start = len(block_recs)
+
+        if batch_start < len(blocks):
+            dispatch_batch(batch_start, len(blocks))
+    except BaseException:
+        # Submitting a batch raises if the pool broke or was shut down, the batches already dispatched are dropped
+        cancel_dispatched_batches()
+        raise
+    finally:
+        # However the loop ends, the temporary records of the blocks must not stay in block_records
+        for block, was_present in zip(blocks, block_record_was_present):
+            if not was_present and block_records.contains_block(block.header_hash):
+                block_records.remove_block_record(block.header_hash)
+
+    # Collect all results into one flat list, attaching the block records so receive_block does not rebuild them
+    if in_process:
+        batch_results = await asyncio.gather(*in_process_futures)
+    else:
+        batch_results = [
+            [PreValidationResult.from_bytes(result_bytes) for result_bytes in batch_result]
+            for batch_result in await asyncio.gather(*futures)
+        ]
+    results: List[PreValidationResult] = []
+    block_recs_iter = iter(block_recs)
+    for batch_result in batch_results:
+        for result in batch_result:
+            block_rec = next(block_recs_iter)
+            if result.error is None:
+                result = PreValidationResult(result.error, result.required_iters, block_rec)
+            results.append(result)
+    return results
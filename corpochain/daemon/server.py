@@ -2,32 +2,30 @@ from __future__ import annotations
 
 import asyncio
 import functools
+import inspect
 import json
 import logging
 import os
+import re
 import signal
 import ssl
 import subprocess
 import sys
-import time
 import traceback
 import uuid
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 from contextlib import asynccontextmanager
 from enum import Enum
 from pathlib import Path
-from typing import Any, AsyncIterator, Dict, List, Optional, Set, TextIO, Tuple
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Mapping, Optional, Set, TextIO, Tuple, cast
 
 from corpochain import __version__
 from corpochain.cmds.init_funcs import check_keys, corpochain_full_version_str, corpochain_init
 from corpochain.cmds.passphrase_funcs import default_passphrase, using_default_passphrase
 from corpochain.daemon.keychain_server import KeychainServer, keychain_commands
 from corpochain.daemon.windows_signal import kill
-from corpochain.plotters.plotters import get_available_plotters
-from corpochain.plotting.util import add_plot_directory
-from corpochain.server.server import ssl_context_for_root, ssl_context_for_server
-from corpochain.ssl.create_ssl import get_mozilla_ca_crt
-from corpochain.util.beta_metrics import BetaMetricsLogger
+from corpochain.server.server import ssl_context_for_server
 from corpochain.util.corpochain_logging import initialize_service_logging
 from corpochain.util.config import load_config
 from corpochain.util.errors import KeychainCurrentPassphraseIsInvalid
@@ -39,10 +37,8 @@ from corpochain.util.service_groups import validate_service
 from corpochain.util.setproctitle import setproctitle
 from corpochain.util.ws_message import WsRpcMessage, create_payload, format_response
 
-io_pool_exc = ThreadPoolExecutor()
-
 try:
-    from aiohttp import ClientSession, WSMsgType, web
+    from aiohttp import WSMsgType, web
     from aiohttp.web_ws import WebSocketResponse
 except ModuleNotFoundError:
     print("Error: Make sure to run . ./activate from the project folder before starting Corpochain.")
@@ -54,19 +50,25 @@ log = logging.getLogger(__name__)
 service_plotter = "corpochain_plotter"
 
 
-async def fetch(url: str):
-    async with ClientSession() as session:
+@functools.lru_cache(maxsize=4)
+def _ssl_context(ca_crt_path: Path, ca_key_path: Path, crt_path: Path, key_path: Path) -> ssl.SSLContext:
+    """
+    Returns the server context of the daemon's websocket listener for a set of certificates. Contexts are built once
+    per key, since loading the certificates reads and parses the files, and they are fully configured here as the
+    instances are shared.
+    """
+    ssl_context = ssl_context_for_server(ca_crt_path, ca_key_path, crt_path, key_path, log=log)
+
+    # Note: the minimum_version has been already set to TLSv1_2
+    # in ssl_context_for_server()
+    # Daemon is internal connections, so override to TLSv1_3 only
+    if ssl.HAS_TLSv1_3:
         try:
-            mozilla_root = get_mozilla_ca_crt()
-            ssl_context = ssl_context_for_root(mozilla_root, log=log)
-            response = await session.get(url, ssl=ssl_context)
-            if not response.ok:
-                log.warning("Response not OK.")
-                return None
-            return await response.text()
-        except Exception as e:
-            log.error(f"Exception while fetching {url}, exception: {e}")
-            return None
+            ssl_context.minimum_version = ssl.TLSVersion.TLSv1_3
+        except ValueError:
+            # in case the attempt above confused the config, set it again (likely not needed but doesn't hurt)
+            ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
+    return ssl_context
 
 
 class PlotState(str, Enum):
@@ -95,7 +97,9 @@ if getattr(sys, "frozen", False):
         "corpochain_crawler": "start_crawler",
     }
 
-    def executable_for_service(service_name: str) -> str:
+    # The path only depends on the name, as the location of the frozen executable does not change
+    @functools.lru_cache(maxsize=None)
+    def _frozen_executable_path(service_name: str) -> str:
         application_path = os.path.dirname(sys.executable)
         if sys.platform == "win32" or sys.platform == "cygwin":
             executable = name_map[service_name]
@@ -105,6 +109,9 @@ if getattr(sys, "frozen", False):
             path = f"{application_path}/{name_map[service_name]}"
             return path
 
+    def executable_for_service(service_name: str) -> str:
+        return _frozen_executable_path(service_name)
+
 else:
     application_path = os.path.dirname(__file__)
 
@@ -112,6 +119,95 @@ else:
         return service_name
 
 
+# Commands that are rejected if their message has no data
+_COMMANDS_WITH_DATA = frozenset(
+    [
+        "start_service",
+        "start_plotting",
+        "stop_plotting",
+        "stop_service",
+        "is_running",
+        "register_service",
+    ]
+)
+_KEYCHAIN_COMMANDS = frozenset(keychain_commands)
+
+# Stands in for a message that could not be parsed when responding with an error. It is shared, so it is read-only
+_EMPTY_MESSAGE: WsRpcMessage = cast(
+    WsRpcMessage,
+    MappingProxyType(
+        {
+            "command": "",
+            "ack": False,
+            "data": {},
+            "request_id": "",
+            "destination": "",
+            "origin": "",
+        }
+    ),
+)
+
+
+# Optional plotter arguments as (request key, command line option, kind). "value" passes the value after the option,
+# "digit" does the same only if the value is a non-negative integer, and "flag" adds the option alone if the value is True
+_CHIAPOS_OPTIONS: Tuple[Tuple[str, str, str], ...] = (
+    ("t2", "-2", "value"),  # Temp2 directory
+    ("a", "-a", "value"),  # Fingerprint
+    ("e", "-e", "flag"),  # Disable bitfield
+    ("x", "-x", "flag"),  # Exclude final directory
+    ("overrideK", "--override-k", "flag"),  # Force plot sizes < k32
+)
+# Common options among diskplot, ramplot, cudaplot
+_BLADEBIT_OPTIONS: Tuple[Tuple[str, str, str], ...] = (
+    ("w", "--warmstart", "flag"),
+    ("m", "--nonuma", "flag"),
+    ("no_cpu_affinity", "--no-cpu-affinity", "flag"),
+    ("compress", "--compress", "digit"),  # Compression level
+)
+_BLADEBIT_CUDAPLOT_OPTIONS: Tuple[Tuple[str, str, str], ...] = (
+    ("device", "--device", "digit"),
+    ("t", "-t", "value"),  # Temp directory
+    ("t2", "-2", "value"),  # Temp2 directory
+    ("disk_128", "--disk-128", "flag"),
+    ("disk_16", "--disk-16", "flag"),
+)
+# The temp directory "-t" is required for diskplot, and added before these
+_BLADEBIT_DISKPLOT_OPTIONS: Tuple[Tuple[str, str, str], ...] = (
+    ("t2", "-2", "value"),  # Temp2 directory
+    ("u", "-u", "value"),  # Buckets
+    ("cache", "--cache", "value"),
+    ("f1_threads", "--f1-threads", "value"),
+    ("fp_threads", "--fp-threads", "value"),
+    ("c_threads", "--c-threads", "value"),
+    ("p2_threads", "--p2-threads", "value"),
+    ("p3_threads", "--p3-threads", "value"),
+    ("alternate", "--alternate", "flag"),
+    ("no_t1_direct", "--no-t1-direct", "flag"),
+    ("no_t2_direct", "--no-t2-direct", "flag"),
+)
+
+
+def _append_plotting_options(
+    command_args: List[str], request: Dict[str, Any], options: Tuple[Tuple[str, str, str], ...]
+) -> None:
+    for key, option, kind in options:
+        value = request.get(key)
+        if kind == "flag":
+            if value is True:
+                command_args.append(option)
+        elif value is not None and (kind != "digit" or str(value).isdigit()):
+            command_args.append(option)
+            command_args.append(str(value))
+
+
+def _get_str(request: Dict[str, Any], name: str) -> Optional[str]:
+    """Returns the value of a request field, or None if it is missing or not a string"""
+    value = request.get(name)
+    if isinstance(value, str):
+        return value
+    return None
+
+
 async def ping() -> Dict[str, Any]:
     response = {"success": True, "value": "pong"}
     return response
@@ -130,8 +226,19 @@ class WebSocketServer:
         self.root_path = root_path
         self.log = log
         self.services: Dict[str, List[subprocess.Popen]] = dict()
+        # The environment of the launched services and plotters, which gets the possibly altered CORPOCHAIN_ROOT
+        self.child_env: Dict[str, str] = {**os.environ, "CORPOCHAIN_ROOT": str(root_path)}
         self.plots_queue: List[Dict] = []
+        # The items of plots_queue by id
+        self.plots_queue_by_id: Dict[str, Dict[str, Any]] = {}
+        # The ids of the running serial plots by queue, kept up to date by _set_plot_state()
+        self.serial_plots_running: Dict[str, Set[str]] = {}
+        # The ids of the serial plots by queue in submission order. Plots that are no longer submitted are only
+        # dropped once they reach the front
+        self.serial_plots_submitted: Dict[str, Deque[str]] = {}
         self.connections: Dict[str, Set[WebSocketResponse]] = dict()  # service name : {WebSocketResponse}
+        # WebSocketResponse : {service name}, the reverse of connections
+        self.connection_services: Dict[WebSocketResponse, Set[str]] = dict()
         self.ping_job: Optional[asyncio.Task] = None
         self.net_config = load_config(root_path, "config.yaml")
         self.self_hostname = self.net_config["self_hostname"]
@@ -139,25 +246,36 @@ class WebSocketServer:
         self.daemon_max_message_size = self.net_config.get("daemon_max_message_size", 50 * 1000 * 1000)
         self.heartbeat = self.net_config.get("daemon_heartbeat", 300)
         self.webserver: Optional[WebServer] = None
-        self.ssl_context = ssl_context_for_server(ca_crt_path, ca_key_path, crt_path, key_path, log=self.log)
+        self.ssl_context = _ssl_context(ca_crt_path, ca_key_path, crt_path, key_path)
         self.keychain_server = KeychainServer()
         self.run_check_keys_on_unlock = run_check_keys_on_unlock
         self.shutdown_event = asyncio.Event()
+        # Handlers of the daemon's own commands, called with the websocket and the data of the message
+        self.command_handlers: Dict[str, Callable[[WebSocketResponse, Dict[str, Any]], Any]] = {
+            "ping": lambda websocket, data: ping(),
+            "start_service": lambda websocket, data: self.start_service(data),
+            "start_plotting": lambda websocket, data: self.start_plotting(data),
+            "stop_plotting": lambda websocket, data: self.stop_plotting(data),
+            "stop_service": lambda websocket, data: self.stop_service(data),
+            "running_services": lambda websocket, data: self.running_services(data),
+            "is_running": lambda websocket, data: self.is_running(data),
+            "is_keyring_locked": lambda websocket, data: self.is_keyring_locked(),
+            "keyring_status": lambda websocket, data: self.keyring_status(),
+            "unlock_keyring": lambda websocket, data: self.unlock_keyring(data),
+            "validate_keyring_passphrase": lambda websocket, data: self.validate_keyring_passphrase(data),
+            "set_keyring_passphrase": lambda websocket, data: self.set_keyring_passphrase(data),
+            "remove_keyring_passphrase": lambda websocket, data: self.remove_keyring_passphrase(data),
+            "exit": lambda websocket, data: self.stop(),
+            "register_service": self.register_service,
+            "get_status": lambda websocket, data: self.get_status(),
+            "get_version": lambda websocket, data: self.get_version(),
+            "get_plotters": lambda websocket, data: self.get_plotters(),
+        }
 
     @asynccontextmanager
     async def run(self) -> AsyncIterator[None]:
         self.log.info("Starting Daemon Server")
 
-        # Note: the minimum_version has been already set to TLSv1_2
-        # in ssl_context_for_server()
-        # Daemon is internal connections, so override to TLSv1_3 only
-        if ssl.HAS_TLSv1_3:
-            try:
-                self.ssl_context.minimum_version = ssl.TLSVersion.TLSv1_3
-            except ValueError:
-                # in case the attempt above confused the config, set it again (likely not needed but doesn't hurt)
-                self.ssl_context.minimum_version = ssl.TLSVersion.TLSv1_2
-
         if self.ssl_context.minimum_version is not ssl.TLSVersion.TLSv1_3:
             self.log.warning(
                 (
@@ -228,21 +346,17 @@ class WebSocketServer:
         while True:
             msg = await ws.receive()
             self.log.debug("Received message: %s", msg)
-            decoded: WsRpcMessage = {
-                "command": "",
-                "ack": False,
-                "data": {},
-                "request_id": "",
-                "destination": "",
-                "origin": "",
-            }
+            decoded: WsRpcMessage = _EMPTY_MESSAGE
             if msg.type == WSMsgType.TEXT:
                 try:
                     decoded = json.loads(msg.data)
+                    # Messages for other services are passed on as they were received, unless they were completed
+                    raw_message: Optional[str] = msg.data
                     if "data" not in decoded:
                         decoded["data"] = {}
+                        raw_message = None
 
-                    maybe_response = await self.handle_message(ws, decoded)
+                    maybe_response = await self.handle_message(ws, decoded, raw_message)
                     if maybe_response is None:
                         continue
 
@@ -275,61 +389,83 @@ class WebSocketServer:
         return ws
 
     async def send_all_responses(self, connections: Set[WebSocketResponse], response: str) -> None:
-        for connection in connections:
-            try:
-                await connection.send_str(response)
-            except Exception as e:
-                service_names = self.remove_connection(connection)
-                if len(service_names) == 0:
-                    service_names = ["Unknown"]
+        # All connections are sent to at once, so a slow one does not hold up the others
+        connection_list = list(connections)
+        results = await asyncio.gather(
+            *(connection.send_str(response) for connection in connection_list), return_exceptions=True
+        )
+        for connection, result in zip(connection_list, results):
+            if not isinstance(result, BaseException):
+                continue
+            service_names = self.remove_connection(connection)
+            if len(service_names) == 0:
+                service_names = ["Unknown"]
 
-                if isinstance(e, ConnectionResetError):
-                    self.log.info(f"Peer disconnected. Closing websocket with {service_names}")
-                else:
-                    tb = traceback.format_exc()
-                    self.log.error(f"Unexpected exception trying to send to {service_names} (websocket: {e} {tb})")
-                    self.log.info(f"Closing websocket with {service_names}")
+            if isinstance(result, ConnectionResetError):
+                self.log.info(f"Peer disconnected. Closing websocket with {service_names}")
+            else:
+                tb = "".join(traceback.format_exception(type(result), result, result.__traceback__))
+                self.log.error(f"Unexpected exception trying to send to {service_names} (websocket: {result} {tb})")
+                self.log.info(f"Closing websocket with {service_names}")
 
-                await connection.close()
+            await connection.close()
+
+    async def _send_to_websockets(self, websockets: Set[WebSocketResponse], response: str) -> None:
+        websocket_list = list(websockets)
+        results = await asyncio.gather(
+            *(websocket.send_str(response) for websocket in websocket_list), return_exceptions=True
+        )
+        for websocket, result in zip(websocket_list, results):
+            if not isinstance(result, BaseException):
+                continue
+            tb = "".join(traceback.format_exception(type(result), result, result.__traceback__))
+            self.log.error(f"Unexpected exception trying to send to websocket: {result} {tb}")
+            self.remove_connection(websocket)
+            await websocket.close()
 
     def remove_connection(self, websocket: WebSocketResponse) -> List[str]:
         """Returns a list of service names from which the connection was removed"""
         service_names = []
-        for service_name, connections in self.connections.items():
-            try:
-                connections.remove(websocket)
-            except KeyError:
+        for service_name in self.connection_services.pop(websocket, ()):
+            connections = self.connections.get(service_name)
+            if connections is None or websocket not in connections:
                 continue
+            connections.remove(websocket)
             service_names.append(service_name)
         return service_names
 
     async def ping_task(self) -> None:
-        restart = True
-        await asyncio.sleep(30)
-        for service_name, connections in self.connections.items():
-            if service_name == service_plotter:
-                continue
-            for connection in connections.copy():
-                try:
-                    self.log.debug(f"About to ping: {service_name}")
-                    await connection.ping()
-                except asyncio.CancelledError:
-                    self.log.warning("Ping task received Cancel")
-                    restart = False
-                    break
-                except Exception:
-                    self.log.exception(f"Ping error to {service_name}")
+        try:
+            while not self.shutdown_event.is_set():
+                await asyncio.sleep(30)
+                # A snapshot, since services can register or go away while the pings are in flight
+                targets = [
+                    (service_name, connection)
+                    for service_name, connections in list(self.connections.items())
+                    if service_name != service_plotter
+                    for connection in connections
+                ]
+                self.log.debug("About to ping: %s", [service_name for service_name, _ in targets])
+                results = await asyncio.gather(
+                    *(connection.ping() for _, connection in targets), return_exceptions=True
+                )
+                for (service_name, connection), result in zip(targets, results):
+                    if not isinstance(result, BaseException):
+                        continue
+                    self.log.error(f"Ping error to {service_name}", exc_info=result)
                     self.log.error(f"Ping failed, connection closed to {service_name}.")
                     self.remove_connection(connection)
                     await connection.close()
-        if restart is True:
-            self.ping_job = asyncio.create_task(self.ping_task())
+        except asyncio.CancelledError:
+            self.log.warning("Ping task received Cancel")
+            raise
 
     async def handle_message(
-        self, websocket: WebSocketResponse, message: WsRpcMessage
+        self, websocket: WebSocketResponse, message: WsRpcMessage, raw_message: Optional[str] = None
     ) -> Optional[Tuple[str, Set[WebSocketResponse]]]:
         """
         This function gets called when new message is received via websocket.
+        raw_message is the received text of the message, if it can be forwarded as is.
         """
 
         command = message["command"]
@@ -337,63 +473,27 @@ class WebSocketServer:
         if destination != "daemon":
             if destination in self.connections:
                 sockets = self.connections[destination]
-                return dict_to_json_str(message), sockets
+                if raw_message is None:
+                    raw_message = dict_to_json_str(message)
+                return raw_message, sockets
 
             return None
 
         data = message["data"]
-        commands_with_data = [
-            "start_service",
-            "start_plotting",
-            "stop_plotting",
-            "stop_service",
-            "is_running",
-            "register_service",
-        ]
-        if len(data) == 0 and command in commands_with_data:
+        if len(data) == 0 and command in _COMMANDS_WITH_DATA:
             response = {"success": False, "error": f'{command} requires "data"'}
         # Keychain commands should be handled by KeychainServer
-        elif command in keychain_commands:
+        elif command in _KEYCHAIN_COMMANDS:
             response = await self.keychain_server.handle_command(command, data)
-        elif command == "ping":
-            response = await ping()
-        elif command == "start_service":
-            response = await self.start_service(data)
-        elif command == "start_plotting":
-            response = await self.start_plotting(data)
-        elif command == "stop_plotting":
-            response = await self.stop_plotting(data)
-        elif command == "stop_service":
-            response = await self.stop_service(data)
-        elif command == "running_services":
-            response = await self.running_services(data)
-        elif command == "is_running":
-            response = await self.is_running(data)
-        elif command == "is_keyring_locked":
-            response = await self.is_keyring_locked()
-        elif command == "keyring_status":
-            response = await self.keyring_status()
-        elif command == "unlock_keyring":
-            response = await self.unlock_keyring(data)
-        elif command == "validate_keyring_passphrase":
-            response = await self.validate_keyring_passphrase(data)
-        elif command == "set_keyring_passphrase":
-            response = await self.set_keyring_passphrase(data)
-        elif command == "remove_keyring_passphrase":
-            response = await self.remove_keyring_passphrase(data)
-        elif command == "exit":
-            response = await self.stop()
-        elif command == "register_service":
-            response = await self.register_service(websocket, data)
-        elif command == "get_status":
-            response = self.get_status()
-        elif command == "get_version":
-            response = self.get_version()
-        elif command == "get_plotters":
-            response = await self.get_plotters()
         else:
-            self.log.error(f"UK>> {message}")
-            response = {"success": False, "error": f"unknown_command {command}"}
+            handler = self.command_handlers.get(command)
+            if handler is None:
+                self.log.error(f"UK>> {message}")
+                response = {"success": False, "error": f"unknown_command {command}"}
+            else:
+                response = handler(websocket, data)
+                if inspect.isawaitable(response):
+                    response = await response
 
         full_response = format_response(message, response)
         return full_response, {websocket}
@@ -426,8 +526,8 @@ class WebSocketServer:
     async def unlock_keyring(self, request: Dict[str, Any]) -> Dict[str, Any]:
         success: bool = False
         error: Optional[str] = None
-        key: Optional[str] = request.get("key", None)
-        if type(key) is not str:
+        key = _get_str(request, "key")
+        if key is None:
             return {"success": False, "error": "missing key"}
 
         try:
@@ -458,8 +558,8 @@ class WebSocketServer:
     async def validate_keyring_passphrase(self, request: Dict[str, Any]) -> Dict[str, Any]:
         success: bool = False
         error: Optional[str] = None
-        key: Optional[str] = request.get("key", None)
-        if type(key) is not str:
+        key = _get_str(request, "key")
+        if key is None:
             return {"success": False, "error": "missing key"}
 
         try:
@@ -484,19 +584,18 @@ class WebSocketServer:
             current_passphrase = default_passphrase()
 
         if Keychain.has_master_passphrase() and not current_passphrase:
-            current_passphrase = request.get("current_passphrase", None)
-            if type(current_passphrase) is not str:
+            current_passphrase = _get_str(request, "current_passphrase")
+            if current_passphrase is None:
                 return {"success": False, "error": "missing current_passphrase"}
 
-        new_passphrase = request.get("new_passphrase", None)
-        if type(new_passphrase) is not str:
+        new_passphrase = _get_str(request, "new_passphrase")
+        if new_passphrase is None:
             return {"success": False, "error": "missing new_passphrase"}
 
         if not Keychain.passphrase_meets_requirements(new_passphrase):
             return {"success": False, "error": "passphrase doesn't satisfy requirements"}
 
         try:
-            assert new_passphrase is not None  # mypy, I love you
             Keychain.set_master_passphrase(
                 current_passphrase,
                 new_passphrase,
@@ -524,8 +623,8 @@ class WebSocketServer:
         if not Keychain.has_master_passphrase():
             return {"success": False, "error": "passphrase not set"}
 
-        current_passphrase = request.get("current_passphrase", None)
-        if type(current_passphrase) is not str:
+        current_passphrase = _get_str(request, "current_passphrase")
+        if current_passphrase is None:
             return {"success": False, "error": "missing current_passphrase"}
 
         try:
@@ -552,6 +651,9 @@ class WebSocketServer:
         return response
 
     async def get_plotters(self) -> Dict[str, Any]:
+        # The plotters are only needed when plotting, so they are not loaded with the daemon
+        from corpochain.plotters.plotters import get_available_plotters
+
         plotters: Dict[str, Any] = get_available_plotters(self.root_path)
         response: Dict[str, Any] = {"success": True, "plotters": plotters}
         return response
@@ -570,15 +672,7 @@ class WebSocketServer:
             return None
 
         response = create_payload("keyring_status_changed", keyring_status, "daemon", destination)
-
-        for websocket in websockets.copy():
-            try:
-                await websocket.send_str(response)
-            except Exception as e:
-                tb = traceback.format_exc()
-                self.log.error(f"Unexpected exception trying to send to websocket: {e} {tb}")
-                websockets.remove(websocket)
-                await websocket.close()
+        await self._send_to_websockets(websockets, response)
 
     def keyring_status_changed(self, keyring_status: Dict[str, Any], destination: str):
         asyncio.create_task(self._keyring_status_changed(keyring_status, destination))
@@ -600,7 +694,8 @@ class WebSocketServer:
         }
 
         if send_full_log:
-            item["log"] = plot_queue_item.get("log")
+            log_lines: List[str] = plot_queue_item["log"]
+            item["log"] = "".join(log_lines) if len(log_lines) > 0 else None
         return item
 
     def prepare_plot_state_message(self, state: PlotEvent, id):
@@ -611,12 +706,13 @@ class WebSocketServer:
         return message
 
     def extract_plot_queue(self, id=None) -> List[Dict]:
-        send_full_log = id is None
-        data = []
-        for item in self.plots_queue:
-            if id is None or item["id"] == id:
-                data.append(self.plot_queue_to_payload(item, send_full_log))
-        return data
+        if id is not None:
+            # A single item changed, so the rest of the queue is not needed
+            item = self.plots_queue_by_id.get(id)
+            if item is None:
+                return []
+            return [self.plot_queue_to_payload(item, False)]
+        return [self.plot_queue_to_payload(item, True) for item in self.plots_queue]
 
     async def _state_changed(self, service: str, message: Dict[str, Any]):
         """If id is None, send the whole state queue"""
@@ -629,15 +725,7 @@ class WebSocketServer:
             return None
 
         response = create_payload("state_changed", message, service, "ui")
-
-        for websocket in websockets.copy():
-            try:
-                await websocket.send_str(response)
-            except Exception as e:
-                tb = traceback.format_exc()
-                self.log.error(f"Unexpected exception trying to send to websocket: {e} {tb}")
-                websockets.remove(websocket)
-                await websocket.close()
+        await self._send_to_websockets(websockets, response)
 
     def state_changed(self, service: str, message: Dict[str, Any]):
         asyncio.create_task(self._state_changed(service, message))
@@ -664,23 +752,24 @@ class WebSocketServer:
                 # "Copy to <path> finished, took..." if copying to another volume
                 final_words = ["Renamed final plot", "finished, took"]
 
+        final_re = re.compile("|".join(re.escape(word) for word in final_words)) if final_words else None
+
         while True:
-            new_data = await loop.run_in_executor(io_pool_exc, fp.readline)
+            # Reads all the lines the plotter wrote since the last pass in one trip to the default executor, since
+            # file reads can block (e.g. on network drives). An empty list means no new output yet
+            new_lines = await loop.run_in_executor(None, fp.readlines)
 
             if config["state"] is not PlotState.RUNNING:
                 return None
 
-            if new_data not in (None, ""):
-                config["log"] = new_data if config["log"] is None else config["log"] + new_data
+            for new_data in new_lines:
+                config["log"].append(new_data)
                 config["log_new"] = new_data
                 self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.LOG_CHANGED, id))
+                if final_re is not None and final_re.search(new_data):
+                    return None
 
-            if new_data:
-                for word in final_words:
-                    if word in new_data:
-                        return None
-            else:
-                time.sleep(0.5)
+            await asyncio.sleep(0.5)
 
     async def _track_plotting_progress(self, config, loop: asyncio.AbstractEventLoop):
         file_path = config["out_file"]
@@ -708,28 +797,11 @@ class WebSocketServer:
     def _chiapos_plotting_command_args(self, request: Any, ignoreCount: bool) -> List[str]:
         k = request["k"]  # Plot size
         t = request["t"]  # Temp directory
-        t2 = request.get("t2")  # Temp2 directory
         b = request["b"]  # Buffer size
         u = request["u"]  # Buckets
-        a = request.get("a")  # Fingerprint
-        e = request["e"]  # Disable bitfield
-        x = request["x"]  # Exclude final directory
-        override_k = request["overrideK"]  # Force plot sizes < k32
 
         command_args: List[str] = ["-k", str(k), "-t", t, "-b", str(b), "-u", str(u)]
-
-        if t2 is not None:
-            command_args.append("-2")
-            command_args.append(str(t2))
-        if a is not None:
-            command_args.append("-a")
-            command_args.append(str(a))
-        if e is True:
-            command_args.append("-e")
-        if x is True:
-            command_args.append("-x")
-        if override_k is True:
-            command_args.append("--override-k")
+        _append_plotting_options(command_args, request, _CHIAPOS_OPTIONS)
 
         return command_args
 
@@ -739,97 +811,21 @@ class WebSocketServer:
             raise ValueError(f"Unknown plot_type: {plot_type}")
 
         command_args: List[str] = []
+        _append_plotting_options(command_args, request, _BLADEBIT_OPTIONS)
 
-        # Common options among diskplot, ramplot, cudaplot
-        w = request.get("w", False)  # Warm start
-        m = request.get("m", False)  # Disable NUMA
-        no_cpu_affinity = request.get("no_cpu_affinity", False)
-        compress = request.get("compress", None)  # Compression level
-
-        if w is True:
-            command_args.append("--warmstart")
-        if m is True:
-            command_args.append("--nonuma")
-        if no_cpu_affinity is True:
-            command_args.append("--no-cpu-affinity")
-        if compress is not None and str(compress).isdigit():
-            command_args.append("--compress")
-            command_args.append(str(compress))
-        
         # ramplot don't accept any more options
         if plot_type == "ramplot":
             return command_args
 
-        # Options only applicable for cudaplot
         if plot_type == "cudaplot":
-            device_index = request.get("device", None)
-            t1 = request.get("t", None)  # Temp directory
-            t2 = request.get("t2", None)  # Temp2 directory
-            disk_128 = request.get("disk_128", False)
-            disk_16 = request.get("disk_16", False)
-
-            if device_index is not None and str(device_index).isdigit():
-                command_args.append("--device")
-                command_args.append(str(device_index))
-            if t1 is not None:
-                command_args.append("-t")
-                command_args.append(t1)
-            if t2 is not None:
-                command_args.append("-2")
-                command_args.append(t2)
-            if disk_128:
-                command_args.append("--disk-128")
-            if disk_16:
-                command_args.append("--disk-16")
+            _append_plotting_options(command_args, request, _BLADEBIT_CUDAPLOT_OPTIONS)
             return command_args
 
         # if plot_type == "diskplot"
         # memo = request["memo"]
-        t1 = request["t"]  # Temp directory
-        t2 = request.get("t2")  # Temp2 directory
-        u = request.get("u")  # Buckets
-        cache = request.get("cache")
-        f1_threads = request.get("f1_threads")
-        fp_threads = request.get("fp_threads")
-        c_threads = request.get("c_threads")
-        p2_threads = request.get("p2_threads")
-        p3_threads = request.get("p3_threads")
-        alternate = request.get("alternate", False)
-        no_t1_direct = request.get("no_t1_direct", False)
-        no_t2_direct = request.get("no_t2_direct", False)
-
         command_args.append("-t")
-        command_args.append(t1)
-        if t2 is not None:
-            command_args.append("-2")
-            command_args.append(t2)
-        if u is not None:
-            command_args.append("-u")
-            command_args.append(str(u))
-        if cache is not None:
-            command_args.append("--cache")
-            command_args.append(str(cache))
-        if f1_threads is not None:
-            command_args.append("--f1-threads")
-            command_args.append(str(f1_threads))
-        if fp_threads is not None:
-            command_args.append("--fp-threads")
-            command_args.append(str(fp_threads))
-        if c_threads is not None:
-            command_args.append("--c-threads")
-            command_args.append(str(c_threads))
-        if p2_threads is not None:
-            command_args.append("--p2-threads")
-            command_args.append(str(p2_threads))
-        if p3_threads is not None:
-            command_args.append("--p3-threads")
-            command_args.append(str(p3_threads))
-        if alternate is not None:
-            command_args.append("--alternate")
-        if no_t1_direct is not None:
-            command_args.append("--no-t1-direct")
-        if no_t2_direct is not None:
-            command_args.append("--no-t2-direct")
+        command_args.append(request["t"])  # Temp directory
+        _append_plotting_options(command_args, request, _BLADEBIT_DISKPLOT_OPTIONS)
 
         return command_args
 
@@ -881,30 +877,35 @@ class WebSocketServer:
 
         return command_args
 
+    def _set_plot_state(self, config: Dict[str, Any], state: PlotState) -> None:
+        config["state"] = state
+        if config["parallel"] is False:
+            running = self.serial_plots_running.setdefault(config["queue"], set())
+            if state is PlotState.RUNNING:
+                running.add(config["id"])
+            else:
+                running.discard(config["id"])
+
     def _is_serial_plotting_running(self, queue: str = "default") -> bool:
-        response = False
-        for item in self.plots_queue:
-            if item["queue"] == queue and item["parallel"] is False and item["state"] is PlotState.RUNNING:
-                response = True
-        return response
+        return len(self.serial_plots_running.get(queue, ())) > 0
 
     def _get_plots_queue_item(self, id: str):
-        config = next(item for item in self.plots_queue if item["id"] == id)
-        return config
+        return self.plots_queue_by_id.get(id)
 
     def _run_next_serial_plotting(self, loop: asyncio.AbstractEventLoop, queue: str = "default"):
-        next_plot_id = None
-
         if self._is_serial_plotting_running(queue) is True:
             return None
 
-        for item in self.plots_queue:
-            if item["queue"] == queue and item["state"] is PlotState.SUBMITTED and item["parallel"] is False:
-                next_plot_id = item["id"]
-                break
-
-        if next_plot_id is not None:
-            loop.create_task(self._start_plotting(next_plot_id, loop, queue))
+        submitted = self.serial_plots_submitted.get(queue)
+        while submitted:
+            item = self.plots_queue_by_id.get(submitted[0])
+            if item is not None and item["state"] is PlotState.SUBMITTED:
+                # Left in place until it starts, as the first submitted plot is the next one to run. A plot that is
+                # already being launched only needs to be waited for
+                if not item["launching"]:
+                    loop.create_task(self._start_plotting(item["id"], loop, queue))
+                return None
+            submitted.popleft()
 
     def _post_process_plotting_job(self, job: Dict[str, Any]):
         id: str = job["id"]
@@ -912,6 +913,8 @@ class WebSocketServer:
         exclude_final_dir: bool = job["exclude_final_dir"]
         log.info(f"Post-processing plotter job with ID {id}")  # lgtm [py/clear-text-logging-sensitive-data]
         if not exclude_final_dir:
+            from corpochain.plotting.util import add_plot_directory
+
             try:
                 add_plot_directory(self.root_path, final_dir)
             except ValueError as e:
@@ -930,6 +933,11 @@ class WebSocketServer:
             if state is not PlotState.SUBMITTED:
                 raise Exception(f"Plot with ID {id} has no state submitted")
 
+            if config["launching"]:
+                # Another task is already launching this plot, which stays submitted until the plotter runs
+                return None
+            config["launching"] = True
+
             assert id == config["id"]
             delay = config["delay"]
             await asyncio.sleep(delay)
@@ -946,11 +954,20 @@ class WebSocketServer:
 
             self.log.debug(f"command_args before launch_plotter are {command_args}")
             self.log.debug(f"self.root_path before launch_plotter is {self.root_path}")
-            process, pid_path = launch_plotter(self.root_path, service_name, command_args, id)
+            # Creating the log and PID files, and the process, happens in a thread so that slow disks do not
+            # hold up the loop
+            process, pid_path = await loop.run_in_executor(
+                None, launch_plotter, self.root_path, service_name, command_args, id, self.child_env
+            )
+
+            if config["state"] is not PlotState.SUBMITTED:
+                # The plot was stopped while it was launched
+                await kill_processes([process], self.root_path, service_plotter, id)
+                return None
 
             current_process = process
 
-            config["state"] = PlotState.RUNNING
+            self._set_plot_state(config, PlotState.RUNNING)
             config["out_file"] = plotter_log_path(self.root_path, id).absolute()
             config["process"] = process
             self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.STATE_CHANGED, id))
@@ -964,7 +981,7 @@ class WebSocketServer:
 
             self.log.debug("finished tracking plotting progress. setting state to FINISHED")
 
-            config["state"] = PlotState.FINISHED
+            self._set_plot_state(config, PlotState.FINISHED)
             self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.STATE_CHANGED, id))
 
             self._post_process_plotting_job(config)
@@ -972,7 +989,7 @@ class WebSocketServer:
         except (subprocess.SubprocessError, IOError):
             log.exception(f"problem starting {service_name}")  # lgtm [py/clear-text-logging-sensitive-data]
             error = Exception("Start plotting failed")
-            config["state"] = PlotState.FINISHED
+            self._set_plot_state(config, PlotState.FINISHED)
             config["error"] = error
             self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.STATE_CHANGED, id))
             raise error
@@ -996,7 +1013,13 @@ class WebSocketServer:
         count = int(request.get("n", 1))
         queue = request.get("queue", "default")
 
+        # The arguments are the same for every plot, except that madmax swaps its temp directories on every other one
+        command_args_variants = [self._build_plotting_command_args(request, True, 0)]
+        if plotter == "madmax" and count > 1:
+            command_args_variants.append(self._build_plotting_command_args(request, True, 1))
+
         ids: List[str] = []
+        configs: List[Dict[str, Any]] = []
         for k in range(count):
             id = str(uuid.uuid4())
             ids.append(id)
@@ -1006,13 +1029,15 @@ class WebSocketServer:
                 "queue": queue,
                 "plotter": plotter,
                 "service_name": service_name,
-                "command_args": self._build_plotting_command_args(request, True, k),
+                # Copied, as each plot adds its own arguments when it starts
+                "command_args": list(command_args_variants[k % len(command_args_variants)]),
                 "parallel": parallel,
                 "delay": delay * k if parallel is True else delay,
                 "state": PlotState.SUBMITTED,
+                "launching": False,  # Set once a task started launching the plot, which is still submitted
                 "deleted": False,
                 "error": None,
-                "log": None,
+                "log": [],  # The lines written so far, only joined when the full log is sent
                 "process": None,
                 "temp_dir": temp_dir,
                 "final_dir": final_dir,
@@ -1020,10 +1045,19 @@ class WebSocketServer:
             }
 
             self.plots_queue.append(config)
+            self.plots_queue_by_id[id] = config
+            if parallel is False:
+                self.serial_plots_submitted.setdefault(queue, deque()).append(id)
+            configs.append(config)
 
-            # notify GUI about new plot queue item
-            self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.STATE_CHANGED, id))
+        # notify GUI about the new plot queue items at once, before any of them can change state
+        message = {
+            "state": PlotEvent.STATE_CHANGED,
+            "queue": [self.plot_queue_to_payload(config, False) for config in configs],
+        }
+        self.state_changed(service_plotter, message)
 
+        for k, config in enumerate(configs):
             # only the first item can start when user selected serial plotting
             can_start_serial_plotting = k == 0 and self._is_serial_plotting_running(queue) is False
 
@@ -1031,7 +1065,7 @@ class WebSocketServer:
                 log.info(f"Plotting will start in {config['delay']} seconds")
                 # TODO: loop gets passed down a lot, review for potential removal
                 loop = asyncio.get_running_loop()
-                loop.create_task(self._start_plotting(id, loop, queue))
+                loop.create_task(self._start_plotting(config["id"], loop, queue))
             else:
                 log.info("Plotting will start automatically when previous plotting finish")
 
@@ -1061,16 +1095,17 @@ class WebSocketServer:
             run_next = False
             if process is not None and state == PlotState.RUNNING:
                 run_next = True
-                config["state"] = PlotState.REMOVING
+                self._set_plot_state(config, PlotState.REMOVING)
                 self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.STATE_CHANGED, id))
                 await kill_processes([process], self.root_path, service_plotter, id)
 
-            config["state"] = PlotState.FINISHED
+            self._set_plot_state(config, PlotState.FINISHED)
             config["deleted"] = True
 
             self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.STATE_CHANGED, id))
 
             self.plots_queue.remove(config)
+            del self.plots_queue_by_id[id]
 
             if run_next:
                 # TODO: review to see if we can remove this
@@ -1080,7 +1115,7 @@ class WebSocketServer:
             return {"success": True}
         except Exception as e:
             log.error(f"Error during killing the plot process: {e}")
-            config["state"] = PlotState.FINISHED
+            self._set_plot_state(config, PlotState.FINISHED)
             config["error"] = str(e)
             self.state_changed(service_plotter, self.prepare_plot_state_message(PlotEvent.STATE_CHANGED, id))
             return {"success": False}
@@ -1119,7 +1154,7 @@ class WebSocketServer:
                 exe_command = service_command
                 if testing is True:
                     exe_command = f"{service_command} --testing=true"
-                process, pid_path = launch_service(self.root_path, exe_command)
+                process, pid_path = launch_service(self.root_path, exe_command, self.child_env)
                 self.services[service_command] = [process]
                 success = True
             except (subprocess.SubprocessError, IOError):
@@ -1177,6 +1212,7 @@ class WebSocketServer:
         if service not in self.connections:
             self.connections[service] = set()
         self.connections[service].add(websocket)
+        self.connection_services.setdefault(websocket, set()).add(service)
 
         response: Dict[str, Any] = {"success": True}
         if service == service_plotter:
@@ -1217,41 +1253,43 @@ def pid_path_for_service(root_path: Path, service: str, id: str = "") -> Path:
     return root_path / "run" / f"{pid_name}{id}.pid"
 
 
+# Popen copies the startup info it is given, so one instance is shared by all launches
+if sys.platform == "win32" or sys.platform == "cygwin":
+    _startupinfo = subprocess.STARTUPINFO()
+    _startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _launch_startupinfo: Optional[subprocess.STARTUPINFO] = _startupinfo
+    # CREATE_NEW_PROCESS_GROUP allows graceful shutdown on windows, by CTRL_BREAK_EVENT signal
+    # If the current process group is used, CTRL_C_EVENT will kill the parent and everyone in the group!
+    _launch_creationflags = subprocess.CREATE_NEW_PROCESS_GROUP
+else:
+    _launch_startupinfo = None
+    _launch_creationflags = 0
+
+
 def plotter_log_path(root_path: Path, id: str):
     return root_path / "plotter" / f"plotter_log_{id}.txt"
 
 
-def launch_plotter(root_path: Path, service_name: str, service_array: List[str], id: str):
-    # we need to pass on the possibly altered CORPOCHAIN_ROOT
-    os.environ["CORPOCHAIN_ROOT"] = str(root_path)
+def launch_plotter(root_path: Path, service_name: str, service_array: List[str], id: str, env: Mapping[str, str]):
     service_executable = executable_for_service(service_array[0])
 
     # Swap service name with name of executable
     service_array[0] = service_executable
-    startupinfo = None
-    creationflags = 0
-    if sys.platform == "win32" or sys.platform == "cygwin":
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-        # If the current process group is used, CTRL_C_EVENT will kill the parent and everyone in the group!
-        creationflags = subprocess.CREATE_NEW_PROCESS_GROUP
 
     plotter_path = plotter_log_path(root_path, id)
 
-    if plotter_path.parent.exists():
-        if plotter_path.exists():
-            plotter_path.unlink()
-    else:
-        plotter_path.parent.mkdir(parents=True, exist_ok=True)
-    outfile = open(plotter_path.resolve(), "w")
+    # Opening for writing truncates a log left over from a previous run
+    plotter_path.parent.mkdir(parents=True, exist_ok=True)
+    outfile = open(plotter_path, "w")
     log.info(f"Service array: {service_array}")  # lgtm [py/clear-text-logging-sensitive-data]
     process = subprocess.Popen(
         service_array,
         shell=False,
         stderr=outfile,
         stdout=outfile,
-        startupinfo=startupinfo,
-        creationflags=creationflags,
+        startupinfo=_launch_startupinfo,
+        creationflags=_launch_creationflags,
+        env=env,
     )
 
     pid_path = pid_path_for_service(root_path, service_name, id)
@@ -1264,37 +1302,26 @@ def launch_plotter(root_path: Path, service_name: str, service_array: List[str],
     return process, pid_path
 
 
-def launch_service(root_path: Path, service_command) -> Tuple[subprocess.Popen, Path]:
+def launch_service(root_path: Path, service_command, env: Mapping[str, str]) -> Tuple[subprocess.Popen, Path]:
     """
     Launch a child process.
     """
-    # set up CORPOCHAIN_ROOT
-    # invoke correct script
+    # invoke correct script, with env setting up CORPOCHAIN_ROOT
     # save away PID
 
-    # we need to pass on the possibly altered CORPOCHAIN_ROOT
-    os.environ["CORPOCHAIN_ROOT"] = str(root_path)
-
     # Insert proper e
     service_array = service_command.split()
     service_executable = executable_for_service(service_array[0])
     service_array[0] = service_executable
 
-    startupinfo = None
-    if sys.platform == "win32" or sys.platform == "cygwin":
-        startupinfo = subprocess.STARTUPINFO()
-        startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    log.debug(f"Launching service {service_array} with CORPOCHAIN_ROOT: {env.get('CORPOCHAIN_ROOT')}")
 
-    log.debug(f"Launching service {service_array} with CORPOCHAIN_ROOT: {os.environ['CORPOCHAIN_ROOT']}")
-
-    # CREATE_NEW_PROCESS_GROUP allows graceful shutdown on windows, by CTRL_BREAK_EVENT signal
-    if sys.platform == "win32" or sys.platform == "cygwin":
-        creationflags = subprocess.CREATE_NEW_PROCESS_GROUP
-    else:
-        creationflags = 0
-    environ_copy = os.environ.copy()
     process = subprocess.Popen(
-        service_array, shell=False, startupinfo=startupinfo, creationflags=creationflags, env=environ_copy
+        service_array,
+        shell=False,
+        startupinfo=_launch_startupinfo,
+        creationflags=_launch_creationflags,
+        env=env,
     )
 
     pid_path = pid_path_for_service(root_path, service_command)
@@ -1326,18 +1353,19 @@ async def kill_processes(
         for process in processes:
             process.terminate()
 
-    count: float = 0
-    while count < delay_before_kill:
-        if all(process.poll() is not None for process in processes):
-            break
-        await asyncio.sleep(0.5)
-        count += 0.5
-    else:
+    # Waiting in threads lets the loop carry on, and resumes as soon as the processes exit
+    loop = asyncio.get_running_loop()
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*(loop.run_in_executor(None, process.wait) for process in processes)),
+            timeout=delay_before_kill,
+        )
+    except asyncio.TimeoutError:
         for process in processes:
             process.kill()
         log.info("sending kill signal to %s", service_name)
     for process in processes:
-        r = process.wait()
+        r = await loop.run_in_executor(None, process.wait)
         log.info("process %s returned %d", service_name, r)
 
     try:
@@ -1394,6 +1422,8 @@ async def async_run_daemon(root_path: Path, wait_for_unlock: bool = False) -> in
         with Lockfile.create(daemon_launch_lock_path(root_path), timeout=1):
             log.info(f"corpochain-beacon-client version: {corpochain_full_version_str()}")
 
+            from corpochain.util.beta_metrics import BetaMetricsLogger
+
             beta_metrics: Optional[BetaMetricsLogger] = None
             if config.get("beta", {}).get("enabled", False):
                 beta_metrics = BetaMetricsLogger(root_path)
@@ -1423,6 +1453,13 @@ async def async_run_daemon(root_path: Path, wait_for_unlock: bool = False) -> in
 
 
 def run_daemon(root_path: Path, wait_for_unlock: bool = False) -> int:
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        # The daemon only does websocket I/O, which uvloop handles faster than the default loop. It is optional
+        uvloop.install()
     result = asyncio.run(async_run_daemon(root_path, wait_for_unlock))
     return result
 
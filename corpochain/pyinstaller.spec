@@ -69,6 +69,8 @@ entry_points = ["corpochain.cmds.corpochain"] + [f"corpochain.server.start_{s}"
 
 hiddenimports = collect_submodules("py_ecc")
 hiddenimports.extend(entry_points)
+# The CLI imports its subcommand modules by name only when they are invoked, so the analysis can not find them
+hiddenimports.extend(collect_submodules("corpochain.cmds"))
 hiddenimports.extend(keyring_imports)
 
 binaries = []
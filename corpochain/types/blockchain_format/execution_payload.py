@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import List, Optional
 
 from blspy import G2Element
@@ -10,9 +11,30 @@ from corpochain.util.ints import uint64, uint256
 from corpochain.util.streamable import Streamable, streamable
 
 
+class PayloadStatus(IntEnum):
+    """
+    Status of an execution payload, as reported by the Engine API of the execution client.
+    """
+
+    VALID = 0
+    INVALID = 1
+    INVALID_BLOCK_HASH = 2
+    SYNCING = 3
+    ACCEPTED = 4
+    UNKNOWN = 5
+
+    @classmethod
+    def from_str(cls, status: str) -> PayloadStatus:
+        return cls.__members__.get(status, cls.UNKNOWN)
+
+
 @streamable
 @dataclass(frozen=True)
 class WithdrawalV1(Streamable):
+    # Every execution payload carries the withdrawals of all rewarded blocks since the previous transaction block,
+    # which are also rebuilt by create_withdrawals for each new payload, so instances carry no __dict__
+    __slots__ = ("index", "validatorIndex", "address", "amount")
+
     index: uint64
     validatorIndex: uint64
     address: bytes20
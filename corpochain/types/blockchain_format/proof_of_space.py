@@ -42,18 +42,22 @@ def verify_and_get_quality_string(
     original_challenge_hash: bytes32,
     signage_point: bytes32,
 ) -> Optional[bytes32]:
-    # Exactly one of (pool_public_key, pool_contract_puzzle_hash) must not be None
-    if (pos.pool_public_key is None) and (pos.pool_contract_puzzle_hash is None):
-        log.error("Fail 1")
-        return None
-    if (pos.pool_public_key is not None) and (pos.pool_contract_puzzle_hash is not None):
-        log.error("Fail 2")
-        return None
-    if pos.size < constants.MIN_PLOT_SIZE:
-        log.error("Fail 3")
+    plot_id = verify_pos_challenge(pos, constants, original_challenge_hash, signage_point)
+    if plot_id is None:
         return None
-    if pos.size > constants.MAX_PLOT_SIZE:
-        log.error("Fail 4")
+    return get_quality_string(pos, plot_id)
+
+
+def verify_pos_challenge(
+    pos: ProofOfSpace,
+    constants: ConsensusConstants,
+    original_challenge_hash: bytes32,
+    signage_point: bytes32,
+) -> Optional[bytes32]:
+    """
+    Does all the checks of verify_and_get_quality_string except for the proof itself, and returns the plot id.
+    """
+    if not pos_has_valid_shape(pos, constants.MIN_PLOT_SIZE, constants.MAX_PLOT_SIZE):
         return None
     plot_id: bytes32 = get_plot_id(pos)
     new_challenge: bytes32 = calculate_pos_challenge(plot_id, original_challenge_hash, signage_point)
@@ -66,7 +70,24 @@ def verify_and_get_quality_string(
         log.error("Fail 5")
         return None
 
-    return get_quality_string(pos, plot_id)
+    return plot_id
+
+
+def pos_has_valid_shape(pos: ProofOfSpace, min_plot_size: int, max_plot_size: int) -> bool:
+    # Exactly one of (pool_public_key, pool_contract_puzzle_hash) must not be None
+    if (pos.pool_public_key is None) and (pos.pool_contract_puzzle_hash is None):
+        log.error("Fail 1")
+        return False
+    if (pos.pool_public_key is not None) and (pos.pool_contract_puzzle_hash is not None):
+        log.error("Fail 2")
+        return False
+    if pos.size < min_plot_size:
+        log.error("Fail 3")
+        return False
+    if pos.size > max_plot_size:
+        log.error("Fail 4")
+        return False
+    return True
 
 
 def get_quality_string(pos: ProofOfSpace, plot_id: bytes32) -> Optional[bytes32]:
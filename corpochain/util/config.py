@@ -19,6 +19,11 @@ from typing_extensions import Literal
 
 from corpochain.util.lock import Lockfile
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
 log = logging.getLogger(__name__)
 
 
@@ -129,9 +134,9 @@ def _load_config_maybe_locked(
                 if acquire_lock:
                     exit_stack.enter_context(lock_config(root_path, filename))
                 with open(path, "r") as opened_config_file:
-                    r = yaml.safe_load(opened_config_file)
+                    r = yaml.load(opened_config_file, Loader=SafeLoader)
             if r is None:
-                log.error(f"yaml.safe_load returned None: {path}")
+                log.error(f"yaml.load with SafeLoader returned None: {path}")
                 time.sleep(i * 0.1)
                 continue
             if sub_config is not None:
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Generator, KeysView
+from typing import Generator, KeysView, Tuple
 
 SERVICES_FOR_GROUP = {
     "all": [
@@ -23,6 +23,9 @@ SERVICES_FOR_GROUP = {
     "seeder-only": ["corpochain_seeder"],
 }
 
+# Frozen list of group names, for CLI choices
+ALL_GROUPS: Tuple[str, ...] = tuple(SERVICES_FOR_GROUP.keys())
+
 
 def all_groups() -> KeysView[str]:
     return SERVICES_FOR_GROUP.keys()
@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 import stat
 import sys
+from functools import lru_cache
 from logging import Logger
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple
@@ -125,10 +126,12 @@ def verify_ssl_certs_and_keys(
     return invalid_files_and_modes
 
 
+@lru_cache(maxsize=4)
 def check_ssl(root_path: Path) -> None:
     """
     Sanity checks on the SSL configuration. Checks that file permissions are properly
     set on the keys and certs, warning and exiting if permissions are incorrect.
+    Only runs once per root path and process.
     """
     if sys.platform == "win32" or sys.platform == "cygwin":
         # TODO: ACLs for SSL certs/keys on Windows
@@ -527,6 +527,16 @@ def function_to_stream_one_item(f_type: Type[Any]) -> StreamFunctionType:
         raise UnsupportedType(f"can't stream {f_type}")
 
 
+def _slotted_getstate(self: Any) -> List[Any]:
+    return [getattr(self, field.name) for field in dataclasses.fields(self)]
+
+
+def _slotted_setstate(self: Any, state: List[Any]) -> None:
+    for field, value in zip(dataclasses.fields(self), state):
+        # The default restores slots with setattr, which frozen dataclasses reject
+        object.__setattr__(self, field.name, value)
+
+
 def streamable(cls: Type[_T_Streamable]) -> Type[_T_Streamable]:
     """
     This decorator forces correct streamable protocol syntax/usage and populates the caches for types hints and
@@ -560,6 +570,11 @@ def streamable(cls: Type[_T_Streamable]) -> Type[_T_Streamable]:
 
     cls._streamable_fields = create_fields(cls)
 
+    if cls.__dict__.get("__slots__"):
+        # Same as what dataclass(slots=True) adds, so that copy and pickle work on frozen classes with __slots__
+        setattr(cls, "__getstate__", _slotted_getstate)
+        setattr(cls, "__setstate__", _slotted_setstate)
+
     return cls  # type: ignore[return-value]
 
 
@@ -607,6 +622,9 @@ class Streamable:
     Make sure to use the streamable decorator when inheriting from the Streamable class to prepare the streaming caches.
     """
 
+    # Empty so subclasses can opt into __slots__, subclasses without __slots__ keep their __dict__
+    __slots__ = ()
+
     _streamable_fields: ClassVar[StreamableFields]
 
     @classmethod
@@ -614,12 +632,11 @@ class Streamable:
         return cls._streamable_fields
 
     def __post_init__(self) -> None:
-        data = self.__dict__
         try:
             for field in self._streamable_fields:
-                object.__setattr__(self, field.name, field.post_init_function(data[field.name]))
+                object.__setattr__(self, field.name, field.post_init_function(getattr(self, field.name)))
         except TypeError as e:
-            missing_fields = [field.name for field in self._streamable_fields if field.name not in data]
+            missing_fields = [field.name for field in self._streamable_fields if not hasattr(self, field.name)]
             if len(missing_fields) > 0:
                 raise ParameterMissingError(type(self), missing_fields) from e
             raise
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import pytest
+
+from corpochain.consensus.block_rewards import _blocks_per_year, _calculate_block_reward, _corpochain_to_gwei
+from corpochain.util.ints import uint32, uint64
+
+
+@pytest.mark.parametrize(
+    "height, reward",
+    [
+        (0, 2 * _corpochain_to_gwei),
+        (3 * _blocks_per_year - 1, 2 * _corpochain_to_gwei),
+        (3 * _blocks_per_year, _corpochain_to_gwei),
+        (6 * _blocks_per_year - 1, _corpochain_to_gwei),
+        (6 * _blocks_per_year, _corpochain_to_gwei // 2),
+        (9 * _blocks_per_year - 1, _corpochain_to_gwei // 2),
+        (9 * _blocks_per_year, _corpochain_to_gwei // 4),
+        (12 * _blocks_per_year - 1, _corpochain_to_gwei // 4),
+        (12 * _blocks_per_year, _corpochain_to_gwei // 8),
+        (15 * _blocks_per_year - 1, _corpochain_to_gwei // 8),
+        (15 * _blocks_per_year, 0),
+        (2**32 - 1, 0),
+    ],
+)
+def test_block_reward_tier_boundaries(height: int, reward: int) -> None:
+    result = _calculate_block_reward(uint32(height))
+    assert type(result) is uint64
+    assert result == reward
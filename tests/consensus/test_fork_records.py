@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+import pytest
+
+from corpochain.beacon.block_store import BlockStore
+from corpochain.consensus.block_record import BlockRecord
+from corpochain.consensus.blockchain import Blockchain
+from corpochain.consensus.default_constants import DEFAULT_CONSTANTS
+from corpochain.types.blockchain_format.classgroup import ClassgroupElement
+from corpochain.types.blockchain_format.sized_bytes import bytes20, bytes32
+from corpochain.util.db_wrapper import DbWrapper
+from corpochain.util.ints import uint8, uint32, uint64, uint128
+
+
+def make_block_record(header_hash: bytes32, prev_hash: bytes32, height: int) -> BlockRecord:
+    return BlockRecord(
+        header_hash,
+        prev_hash,
+        uint32(height),
+        uint128(height + 1),
+        uint128(height + 1),
+        uint8(0),
+        ClassgroupElement.get_default_element(),
+        None,
+        bytes32(b"\x00" * 32),
+        bytes32(b"\x00" * 32),
+        uint64(1024),
+        bytes20(b"\x00" * 20),
+        uint64(1),
+        uint8(0),
+        False,
+        uint32(0),
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+        None,
+    )
+
+
+def make_chain(length: int, tag: bytes, start: Optional[BlockRecord] = None) -> List[BlockRecord]:
+    records: List[BlockRecord] = []
+    prev_hash = DEFAULT_CONSTANTS.GENESIS_CHALLENGE if start is None else start.header_hash
+    first_height = 0 if start is None else start.height + 1
+    for height in range(first_height, first_height + length):
+        record = make_block_record(bytes32(tag + height.to_bytes(31, "big")), bytes32(prev_hash), height)
+        records.append(record)
+        prev_hash = record.header_hash
+    return records
+
+
+class HeightMap:
+    def __init__(self, records: List[BlockRecord]) -> None:
+        self.hashes: Dict[int, bytes32] = {record.height: record.header_hash for record in records}
+
+    def try_get_hash(self, height: uint32) -> Optional[bytes32]:
+        return self.hashes.get(height)
+
+
+@asynccontextmanager
+async def create_block_store(tmp_path: Path) -> AsyncIterator[BlockStore]:
+    db_wrapper = await DbWrapper.create(tmp_path / "blockchain.sqlite", db_version=2)
+    try:
+        yield await BlockStore.create(db_wrapper)
+    finally:
+        await db_wrapper.close()
+
+
+async def add_block_records(block_store: BlockStore, records: List[BlockRecord]) -> None:
+    async with block_store.db_wrapper.writer_maybe_transaction() as conn:
+        await conn.executemany(
+            "INSERT INTO full_blocks VALUES(?, ?, ?, NULL, 0, 0, ?, ?)",
+            [(record.header_hash, record.prev_hash, record.height, b"", bytes(record)) for record in records],
+        )
+
+
+def make_blockchain(block_store: BlockStore, main_chain: List[BlockRecord], cached: List[BlockRecord]) -> Blockchain:
+    # Only the parts of the blockchain the fork walk reads
+    blockchain = Blockchain.__new__(Blockchain)
+    blockchain.constants = DEFAULT_CONSTANTS
+    blockchain.block_store = block_store
+    setattr(blockchain, "_Blockchain__block_records", {record.header_hash: record for record in cached})
+    setattr(blockchain, "_Blockchain__height_map", HeightMap(main_chain))
+    return blockchain
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch_size", [2, 900])
+async def test_prev_block_hash(tmp_path: Path, batch_size: int) -> None:
+    async with create_block_store(tmp_path) as block_store:
+        records = make_chain(7, b"\x01")
+        await add_block_records(block_store, records)
+
+        header_hashes = [record.header_hash for record in reversed(records)]
+        prev_hashes = await block_store.prev_block_hash(header_hashes, batch_size=batch_size)
+        assert prev_hashes == [record.prev_hash for record in reversed(records)]
+
+        with pytest.raises(ValueError):
+            await block_store.prev_block_hash([records[0].header_hash, bytes32(b"\xff" * 32)], batch_size=batch_size)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cached_fork_blocks", [0, 2, 5])
+async def test_collect_fork_records(tmp_path: Path, cached_fork_blocks: int) -> None:
+    async with create_block_store(tmp_path) as block_store:
+        main_chain = make_chain(10, b"\x01")
+        fork = make_chain(6, b"\x02", start=main_chain[3])
+        await add_block_records(block_store, main_chain + fork)
+        blockchain = make_blockchain(block_store, main_chain, fork[:cached_fork_blocks])
+
+        hashes, records = await blockchain._collect_fork_records(fork[-1], 3)
+        assert hashes == [record.header_hash for record in fork]
+        assert records == fork
+
+
+@pytest.mark.asyncio
+async def test_collect_fork_records_full_reorg(tmp_path: Path) -> None:
+    async with create_block_store(tmp_path) as block_store:
+        main_chain = make_chain(4, b"\x01")
+        fork = make_chain(6, b"\x02")
+        await add_block_records(block_store, main_chain + fork)
+        blockchain = make_blockchain(block_store, main_chain, [])
+
+        hashes, records = await blockchain._collect_fork_records(fork[-1], -1)
+        assert hashes == [record.header_hash for record in fork]
+        assert records == fork
+
+
+@pytest.mark.asyncio
+async def test_collect_fork_records_append(tmp_path: Path) -> None:
+    async with create_block_store(tmp_path) as block_store:
+        main_chain = make_chain(4, b"\x01")
+        await add_block_records(block_store, main_chain)
+        blockchain = make_blockchain(block_store, main_chain[:-1], [])
+
+        hashes, records = await blockchain._collect_fork_records(main_chain[-1], 2)
+        assert hashes == [main_chain[-1].header_hash]
+        assert records == [main_chain[-1]]
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import pickle
+import pytest
+
+from corpochain.consensus.default_constants import DEFAULT_CONSTANTS
+from corpochain.consensus.multiprocess_validation import PreValidationResult
+from corpochain.types.blockchain_format.sized_bytes import bytes32
+from corpochain.util.ints import uint16, uint64
+from tests.consensus.test_fork_records import make_block_record
+
+block_record = make_block_record(bytes32(b"\x01" * 32), bytes32(DEFAULT_CONSTANTS.GENESIS_CHALLENGE), 0)
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        PreValidationResult(None, uint64(1000), block_record),
+        PreValidationResult(None, uint64(1000)),
+        PreValidationResult(uint16(7), None),
+    ],
+)
+def test_pre_validation_result_round_trip(result: PreValidationResult) -> None:
+    from_bytes = PreValidationResult.from_bytes(bytes(result))
+    assert from_bytes == result
+    assert from_bytes.block_record == result.block_record
+    assert pickle.loads(pickle.dumps(result)) == result
+
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from corpochain.consensus.blockchain import _get_validation_pool, _validation_pools
+from corpochain.consensus.default_constants import DEFAULT_CONSTANTS
+
+
+def test_broken_validation_pool_is_replaced_once() -> None:
+    mp_context = multiprocessing.get_context("spawn")
+    pool = _get_validation_pool(1, mp_context, DEFAULT_CONSTANTS)
+    try:
+        assert _get_validation_pool(1, mp_context, DEFAULT_CONSTANTS) is pool
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(abs, -1)
+
+        new_pool = _get_validation_pool(1, mp_context, DEFAULT_CONSTANTS, pool)
+        assert new_pool is not pool
+        assert new_pool.submit(abs, -1).result() == 1
+        # Another instance that still holds the broken pool gets the replacement instead of a third pool
+        assert _get_validation_pool(1, mp_context, DEFAULT_CONSTANTS, pool) is new_pool
+    finally:
+        for key, shared_pool in list(_validation_pools.items()):
+            if key[1] == id(mp_context):
+                shared_pool.shutdown(wait=True)
+                del _validation_pools[key]
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from unittest.mock import Mock
+
+import pytest
+
+import corpochain.daemon.server as daemon_server
+from corpochain.daemon.server import PlotEvent, PlotState, WebSocketServer
+from corpochain.ssl.create_ssl import generate_ca_signed_cert, make_ca_cert
+from corpochain.util.config import create_default_corpochain_config
+
+
+@dataclass
+class PlotQueue:
+    server: WebSocketServer
+    # The state_changed messages sent to the plotter service
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    # The ids of the plots that were started, in order
+    started: List[str] = field(default_factory=list)
+
+
+def make_plot_queue(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> PlotQueue:
+    create_default_corpochain_config(tmp_path)
+    ca_crt_path, ca_key_path = tmp_path / "ca.crt", tmp_path / "ca.key"
+    make_ca_cert(ca_crt_path, ca_key_path)
+    crt_path, key_path = tmp_path / "daemon.crt", tmp_path / "daemon.key"
+    generate_ca_signed_cert(ca_crt_path.read_bytes(), ca_key_path.read_bytes(), crt_path, key_path)
+    # The plot queue does not use the keychain
+    monkeypatch.setattr(daemon_server, "KeychainServer", lambda: None)
+
+    plot_queue = PlotQueue(WebSocketServer(tmp_path, ca_crt_path, ca_key_path, crt_path, key_path))
+
+    async def start_plotting(id: str, loop: asyncio.AbstractEventLoop, queue: str = "default") -> None:
+        plot_queue.started.append(id)
+
+    monkeypatch.setattr(plot_queue.server, "_start_plotting", start_plotting)
+    monkeypatch.setattr(
+        plot_queue.server, "state_changed", lambda service, message: plot_queue.messages.append(message)
+    )
+    return plot_queue
+
+
+def plot_request(**kwargs: Any) -> Dict[str, Any]:
+    request = {
+        "service": "corpochain_plotter",
+        "plotter": "chiapos",
+        "k": 32,
+        "n": 1,
+        "t": "/plots/tmp",
+        "d": "/plots",
+        "r": 2,
+        "b": 3400,
+        "u": 128,
+        "queue": "default",
+        "parallel": False,
+    }
+    request.update(kwargs)
+    return request
+
+
+@pytest.mark.asyncio
+async def test_plot_queue_lookup_by_id(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    server = make_plot_queue(tmp_path, monkeypatch).server
+    response = await server.start_plotting(plot_request(n=3))
+    ids: List[str] = response["ids"]
+
+    assert [item["id"] for item in server.plots_queue] == ids
+    assert list(server.plots_queue_by_id) == ids
+    for id in ids:
+        assert server._get_plots_queue_item(id) is server.plots_queue_by_id[id]
+        assert [item["id"] for item in server.extract_plot_queue(id)] == [id]
+    assert len(server.extract_plot_queue()) == 3
+
+    assert await server.stop_plotting({"id": ids[1]}) == {"success": True}
+    assert server._get_plots_queue_item(ids[1]) is None
+    assert server.extract_plot_queue(ids[1]) == []
+    assert [item["id"] for item in server.plots_queue] == [ids[0], ids[2]]
+    assert await server.stop_plotting({"id": ids[1]}) == {"success": False}
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_bladebit_diskplot_flags(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, enabled: bool) -> None:
+    server = make_plot_queue(tmp_path, monkeypatch).server
+    request = plot_request(
+        plotter="bladebit",
+        plot_type="diskplot",
+        alternate=enabled,
+        no_t1_direct=enabled,
+        no_t2_direct=enabled,
+        compress=3,
+    )
+    command_args = server._build_plotting_command_args(request, True, 0)
+
+    assert command_args[:4] == ["corpochain", "plotters", "bladebit", "diskplot"]
+    assert command_args[command_args.index("--compress") + 1] == "3"
+    assert command_args[command_args.index("-t") + 1] == "/plots/tmp"
+    for flag in ("--alternate", "--no-t1-direct", "--no-t2-direct"):
+        assert (flag in command_args) is enabled
+
+
+@pytest.mark.asyncio
+async def test_serial_plots_running_per_queue(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    plot_queue = make_plot_queue(tmp_path, monkeypatch)
+    server = plot_queue.server
+    serial_ids: List[str] = (await server.start_plotting(plot_request(n=2)))["ids"]
+    parallel_ids: List[str] = (await server.start_plotting(plot_request(n=2, parallel=True)))["ids"]
+    other_ids: List[str] = (await server.start_plotting(plot_request(queue="other")))["ids"]
+    await asyncio.sleep(0)
+    assert plot_queue.started == [serial_ids[0], *parallel_ids, other_ids[0]]
+
+    # Parallel plots never hold up a serial queue
+    for id in parallel_ids:
+        server._set_plot_state(server.plots_queue_by_id[id], PlotState.RUNNING)
+    assert not server._is_serial_plotting_running("default")
+
+    server._set_plot_state(server.plots_queue_by_id[serial_ids[0]], PlotState.RUNNING)
+    assert server._is_serial_plotting_running("default")
+    assert not server._is_serial_plotting_running("other")
+    server._run_next_serial_plotting(asyncio.get_running_loop(), "default")
+    await asyncio.sleep(0)
+    assert plot_queue.started == [serial_ids[0], *parallel_ids, other_ids[0]]
+
+    server._set_plot_state(server.plots_queue_by_id[serial_ids[0]], PlotState.FINISHED)
+    assert not server._is_serial_plotting_running("default")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parallel", [False, True])
+async def test_start_plotting_announces_plots_at_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, parallel: bool
+) -> None:
+    plot_queue = make_plot_queue(tmp_path, monkeypatch)
+    ids: List[str] = (await plot_queue.server.start_plotting(plot_request(n=3, parallel=parallel)))["ids"]
+
+    assert len(plot_queue.messages) == 1
+    [message] = plot_queue.messages
+    assert message["state"] is PlotEvent.STATE_CHANGED
+    assert [item["id"] for item in message["queue"]] == ids
+    assert all(item["state"] is PlotState.SUBMITTED for item in message["queue"])
+    # Only the per plot payload is sent, not the full log
+    assert all("log" not in item for item in message["queue"])
+
+    await asyncio.sleep(0)
+    assert plot_queue.started == (ids if parallel else ids[:1])
+
+
+@pytest.mark.asyncio
+async def test_next_serial_plot_in_submission_order(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    plot_queue = make_plot_queue(tmp_path, monkeypatch)
+    server = plot_queue.server
+    loop = asyncio.get_running_loop()
+    ids: List[str] = (await server.start_plotting(plot_request(n=4)))["ids"]
+    await asyncio.sleep(0)
+    assert plot_queue.started == ids[:1]
+
+    # Stopped and finished plots are skipped, and dropped from the submitted plots once they reach the front
+    server._set_plot_state(server.plots_queue_by_id[ids[0]], PlotState.FINISHED)
+    assert await server.stop_plotting({"id": ids[1]}) == {"success": True}
+    server._run_next_serial_plotting(loop, "default")
+    await asyncio.sleep(0)
+    assert plot_queue.started == [ids[0], ids[2]]
+    assert list(server.serial_plots_submitted["default"]) == ids[2:]
+
+    server._set_plot_state(server.plots_queue_by_id[ids[2]], PlotState.FINISHED)
+    server._run_next_serial_plotting(loop, "default")
+    server._set_plot_state(server.plots_queue_by_id[ids[3]], PlotState.FINISHED)
+    server._run_next_serial_plotting(loop, "default")
+    await asyncio.sleep(0)
+    assert plot_queue.started == [ids[0], ids[2], ids[3]]
+    assert len(server.serial_plots_submitted["default"]) == 0
+
+
+@pytest.mark.asyncio
+async def test_plot_launched_once(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    server = make_plot_queue(tmp_path, monkeypatch).server
+    ids: List[str] = (await server.start_plotting(plot_request(n=2, x=True)))["ids"]
+    launched: List[str] = []
+
+    def launch_plotter(
+        root_path: Path, service_name: str, command_args: List[str], id: str, env: Dict[str, str]
+    ) -> Tuple[Any, Path]:
+        launched.append(id)
+        return Mock(), tmp_path / f"{id}.pid"
+
+    async def track_plotting_progress(config: Dict[str, Any], loop: asyncio.AbstractEventLoop) -> None:
+        pass
+
+    monkeypatch.setattr(daemon_server, "launch_plotter", launch_plotter)
+    monkeypatch.setattr(server, "_track_plotting_progress", track_plotting_progress)
+    loop = asyncio.get_running_loop()
+    # Both tasks find the plot submitted, as it only changes state once the plotter was launched
+    await asyncio.gather(
+        WebSocketServer._start_plotting(server, ids[0], loop), WebSocketServer._start_plotting(server, ids[0], loop)
+    )
+    assert launched == [ids[0]]
+    assert server.plots_queue_by_id[ids[0]]["state"] is PlotState.FINISHED
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import copy
+import pickle
+from typing import Any, Callable
+
+import pytest
+
+from corpochain.beacon.signage_point import SignagePoint
+from corpochain.types.blockchain_format.classgroup import ClassgroupElement
+from corpochain.types.blockchain_format.execution_payload import ExecutionPayloadV2, WithdrawalV1
+from corpochain.types.blockchain_format.sized_bytes import bytes20, bytes32, bytes256
+from corpochain.types.blockchain_format.vdf import VDFInfo, VDFProof
+from corpochain.util.ints import uint8, uint64, uint256
+
+round_trips = [
+    pytest.param(copy.copy, id="copy"),
+    pytest.param(copy.deepcopy, id="deepcopy"),
+    pytest.param(lambda item: pickle.loads(pickle.dumps(item)), id="pickle"),
+]
+
+
+@pytest.mark.parametrize("round_trip", round_trips)
+def test_signage_point_round_trip(round_trip: Callable[[Any], Any]) -> None:
+    vdf_info = VDFInfo(bytes32(b"\x01" * 32), uint64(1000), ClassgroupElement.get_default_element())
+    vdf_proof = VDFProof(uint8(0), b"\x02" * 100, True)
+    for signage_point in (
+        SignagePoint(vdf_info, vdf_proof, vdf_info, vdf_proof),
+        SignagePoint(None, None, None, None),
+    ):
+        result = round_trip(signage_point)
+        assert result == signage_point
+        assert bytes(result) == bytes(signage_point)
+
+
+@pytest.mark.parametrize("round_trip", round_trips)
+def test_execution_payload_with_withdrawals_round_trip(round_trip: Callable[[Any], Any]) -> None:
+    withdrawals = [
+        WithdrawalV1(uint64(i), uint64(0), bytes20(bytes([i + 1]) * 20), uint64(1000 * (i + 1))) for i in range(3)
+    ]
+    payload = ExecutionPayloadV2(
+        bytes32(b"\x01" * 32),
+        bytes20(b"\x02" * 20),
+        bytes32(b"\x03" * 32),
+        bytes32(b"\x04" * 32),
+        bytes256(b"\x00" * 256),
+        bytes32(b"\x05" * 32),
+        uint64(10),
+        uint64(30000000),
+        uint64(21000),
+        uint64(1700000000),
+        b"extra",
+        uint256(7),
+        bytes32(b"\x06" * 32),
+        [b"\xf8\x01", b"\xf8\x02"],
+        withdrawals,
+    )
+    for item in (*withdrawals, payload):
+        result = round_trip(item)
+        assert result == item
+        assert bytes(result) == bytes(item)